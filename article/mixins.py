@@ -1,8 +1,8 @@
 from django.utils.functional import cached_property
 
-from directory_cms_client.client import cms_api_client
 from directory_components.helpers import SocialLinkBuilder
 
+from core import cache
 from core.helpers import handle_cms_response
 from .helpers import unslugify
 
@@ -33,11 +33,11 @@ class GetCMSTagMixin:
 
     @cached_property
     def page(self):
-        response = cms_api_client.lookup_by_tag(
+        return cache.lookup_by_tag(
+            handler=handle_cms_response,
             slug=self.slug,
             draft_token=self.request.GET.get('draft_token'),
         )
-        return handle_cms_response(response)
 
     def get_context_data(self, *args, **kwargs):
         return super().get_context_data(
@@ -13,6 +13,7 @@ from core.mixins import (
     NewsSectionFeatureFlagMixin,
     GetCMSComponentMixin,
     GetCMSPageMixin,
+    PrefetchCMSMixin,
 )
 from euexit.mixins import HideLanguageSelectorMixin
 
@@ -135,6 +136,7 @@ class NewsArticleDetailView(
 
 class InternationalNewsListPageView(
     NewsSectionFeatureFlagMixin,
+    PrefetchCMSMixin,
     GetCMSPageMixin,
     GetCMSComponentMixin,
     HideLanguageSelectorMixin,
@@ -68,8 +68,9 @@ MIDDLEWARE_CLASSES = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
+    'core.middleware.RedirectTableMiddleware',
     'sso.middleware.SSOUserMiddleware',
-    'directory_components.middleware.NoCacheMiddlware',
+    'sso.middleware.NoCacheMiddleware',
     'core.middleware.LocaleQuerystringMiddleware',
     'core.middleware.PersistLocaleMiddleware',
     'core.middleware.ForceDefaultLocale',
@@ -88,7 +89,7 @@ TEMPLATES = [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.template.context_processors.i18n',
-                'directory_components.context_processors.sso_processor',
+                'sso.context_processors.sso_processor',
                 'directory_components.context_processors.urls_processor',
                 (
                     'directory_components.context_processors.'
@@ -258,6 +259,18 @@ DIRECTORY_API_CLIENT_BASE_URL = env.str('API_CLIENT_BASE_URL')
 DIRECTORY_API_CLIENT_API_KEY = env.str('API_SIGNATURE_SECRET')
 DIRECTORY_API_CLIENT_SENDER_ID = 'directory'
 DIRECTORY_API_CLIENT_DEFAULT_TIMEOUT = 15
+COMPANY_PROFILE_CACHE_EXPIRE_SECONDS = env.int(
+    'COMPANY_PROFILE_CACHE_EXPIRE_SECONDS', 60 * 2
+)
+REGIONAL_OFFICES_CACHE_EXPIRE_SECONDS = env.int(
+    'REGIONAL_OFFICES_CACHE_EXPIRE_SECONDS', 60 * 60
+)
+REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS = env.int(
+    'REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS', 60 * 60 * 24
+)
+REGIONAL_OFFICES_POSTCODE_REGIONS_FILE = os.path.join(
+    BASE_DIR, 'contact/data/postcode_regions.json'
+)
 
 # directory-sso-proxy
 DIRECTORY_SSO_API_CLIENT_BASE_URL = env.str('SSO_API_CLIENT_BASE_URL')
@@ -270,6 +283,12 @@ SSO_PROXY_SIGNUP_URL = env.str('SSO_PROXY_SIGNUP_URL')
 SSO_PROFILE_URL = env.str('SSO_PROFILE_URL')
 SSO_PROXY_REDIRECT_FIELD_NAME = env.str('SSO_PROXY_REDIRECT_FIELD_NAME')
 SSO_SESSION_COOKIE = env.str('SSO_SESSION_COOKIE')
+SSO_SESSION_USER_CACHE_EXPIRE_SECONDS = env.int(
+    'SSO_SESSION_USER_CACHE_EXPIRE_SECONDS', 60
+)
+SSO_SESSION_USER_NEGATIVE_CACHE_EXPIRE_SECONDS = env.int(
+    'SSO_SESSION_USER_NEGATIVE_CACHE_EXPIRE_SECONDS', 30
+)
 
 SECURE_SSL_REDIRECT = env.bool('SECURE_SSL_REDIRECT', True)
 
@@ -359,16 +378,76 @@ DIRECTORY_CMS_API_CLIENT_SENDER_ID = 'directory'
 DIRECTORY_CMS_API_CLIENT_SERVICE_NAME = cms.EXPORT_READINESS
 DIRECTORY_CMS_API_CLIENT_DEFAULT_TIMEOUT = 15
 
+# CMS page cache
+CMS_PAGE_CACHE_EXPIRE_SECONDS = env.int(
+    'CMS_PAGE_CACHE_EXPIRE_SECONDS', 60 * 5
+)
+CMS_PAGE_CACHE_STALE_SECONDS = env.int(
+    'CMS_PAGE_CACHE_STALE_SECONDS', 60 * 60 * 24
+)
+CMS_PAGE_CACHE_REFRESH_WORKERS = env.int('CMS_PAGE_CACHE_REFRESH_WORKERS', 2)
+CMS_PAGE_LOCAL_CACHE_EXPIRE_SECONDS = env.int(
+    'CMS_PAGE_LOCAL_CACHE_EXPIRE_SECONDS', 30
+)
+CMS_PAGE_LOCAL_CACHE_MAX_SIZE = env.int('CMS_PAGE_LOCAL_CACHE_MAX_SIZE', 500)
+# warm_cms_cache runs before gunicorn binds, so it must finish well within
+# the platform's start up health check timeout
+CMS_WARM_CACHE_DEADLINE_SECONDS = env.float(
+    'CMS_WARM_CACHE_DEADLINE_SECONDS', 20
+)
+CMS_WARM_CACHE_TIMEOUT = env.float('CMS_WARM_CACHE_TIMEOUT', 3)
+CMS_PREFETCH_WORKERS = env.int('CMS_PREFETCH_WORKERS', 4)
+CMS_WEBHOOK_HAWK_ACCESS_KEY = env.str('CMS_WEBHOOK_HAWK_ACCESS_KEY', '')
+CMS_WEBHOOK_HAWK_SECRET_KEY = env.str('CMS_WEBHOOK_HAWK_SECRET_KEY', '')
+
+# redirects
+REDIRECTS_FILE = env.str(
+    'REDIRECTS_FILE', os.path.join(PROJECT_ROOT, 'redirects.json')
+)
+REDIRECTS_RELOAD_CHECK_SECONDS = env.int('REDIRECTS_RELOAD_CHECK_SECONDS', 5)
+
 # directory clients
 DIRECTORY_CLIENT_CORE_CACHE_EXPIRE_SECONDS = 60 * 60 * 24 * 30  # 30 days
 
 # Internal CH
 INTERNAL_CH_BASE_URL = env.str('INTERNAL_CH_BASE_URL', '')
 INTERNAL_CH_API_KEY = env.str('INTERNAL_CH_API_KEY', '')
+INTERNAL_CH_SENDER_ID = env.str('INTERNAL_CH_SENDER_ID', 'directory')
+INTERNAL_CH_DEFAULT_TIMEOUT = env.int('INTERNAL_CH_DEFAULT_TIMEOUT', 5)
+INTERNAL_CH_POOL_SIZE = env.int('INTERNAL_CH_POOL_SIZE', 10)
+INTERNAL_CH_MAX_RETRIES = env.int('INTERNAL_CH_MAX_RETRIES', 2)
+INTERNAL_CH_RETRY_BACKOFF_FACTOR = env.float(
+    'INTERNAL_CH_RETRY_BACKOFF_FACTOR', 0.2
+)
+
+# Companies House search
+COMPANIES_HOUSE_SEARCH_CACHE_MAX_SIZE = env.int(
+    'COMPANIES_HOUSE_SEARCH_CACHE_MAX_SIZE', 1000
+)
+COMPANIES_HOUSE_SEARCH_CACHE_EXPIRE_SECONDS = env.int(
+    'COMPANIES_HOUSE_SEARCH_CACHE_EXPIRE_SECONDS', 60 * 15
+)
+# optional local index built by build_companies_house_index
+COMPANIES_HOUSE_INDEX_FILE = env.str('COMPANIES_HOUSE_INDEX_FILE', '')
+COMPANIES_HOUSE_INDEX_SEARCH_LIMIT = env.int(
+    'COMPANIES_HOUSE_INDEX_SEARCH_LIMIT', 20
+)
+COMPANIES_HOUSE_INDEX_RELOAD_CHECK_SECONDS = env.int(
+    'COMPANIES_HOUSE_INDEX_RELOAD_CHECK_SECONDS', 60
+)
 
 # geo location
 GEOIP_PATH = os.path.join(BASE_DIR, 'core/geolocation_data')
 GEOIP_COUNTRY = 'GeoLite2-Country.mmdb'
+GEOIP_LOOKUP_CACHE_MAX_SIZE = env.int('GEOIP_LOOKUP_CACHE_MAX_SIZE', 10000)
+GEOIP_LOOKUP_CACHE_EXPIRE_SECONDS = env.int(
+    'GEOIP_LOOKUP_CACHE_EXPIRE_SECONDS', 60 * 60
+)
+GEOIP_RELOAD_CHECK_SECONDS = env.int('GEOIP_RELOAD_CHECK_SECONDS', 60)
+
+# name of a header holding the client's country code set by the CDN, such as
+# CloudFront-Viewer-Country. Only set it when the CDN overwrites the header.
+GEOLOCATION_COUNTRY_HEADER = env.str('GEOLOCATION_COUNTRY_HEADER', '')
 
 GEOLOCATION_MAXMIND_DATABASE_FILE_URL = env.str(
     'GEOLOCATION_MAXMIND_DATABASE_FILE_URL',
@@ -377,6 +456,20 @@ GEOLOCATION_MAXMIND_DATABASE_FILE_URL = env.str(
         'GeoLite2-Country.tar.gz'
     )
 )
+GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL = env.str(
+    'GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL',
+    (
+        'http://geolite.maxmind.com/download/geoip/database/'
+        'GeoLite2-Country.tar.gz.md5'
+    )
+)
+GEOLOCATION_MAXMIND_CONNECT_TIMEOUT = env.float(
+    'GEOLOCATION_MAXMIND_CONNECT_TIMEOUT', 3.05
+)
+# applies to each read of the streamed archive, not the whole download
+GEOLOCATION_MAXMIND_READ_TIMEOUT = env.float(
+    'GEOLOCATION_MAXMIND_READ_TIMEOUT', 30
+)
 
 # feature flags
 FEATURE_FLAGS = {
@@ -585,3 +678,32 @@ ACTIVITY_STREAM_API_SECRET_KEY = env.str('ACTIVITY_STREAM_API_SECRET_KEY')
 ACTIVITY_STREAM_API_ACCESS_KEY = env.str('ACTIVITY_STREAM_API_ACCESS_KEY')
 ACTIVITY_STREAM_API_URL = env.str('ACTIVITY_STREAM_API_URL')
 ACTIVITY_STREAM_API_IP_WHITELIST = env.str('ACTIVITY_STREAM_API_IP_WHITELIST')
+ACTIVITY_STREAM_API_POOL_SIZE = env.int('ACTIVITY_STREAM_API_POOL_SIZE', 10)
+ACTIVITY_STREAM_API_CONNECT_TIMEOUT = env.float(
+    'ACTIVITY_STREAM_API_CONNECT_TIMEOUT', 3.05
+)
+ACTIVITY_STREAM_API_READ_TIMEOUT = env.float(
+    'ACTIVITY_STREAM_API_READ_TIMEOUT', 10
+)
+ACTIVITY_STREAM_API_MAX_RETRIES = env.int('ACTIVITY_STREAM_API_MAX_RETRIES', 2)
+ACTIVITY_STREAM_API_RETRY_BACKOFF_FACTOR = env.float(
+    'ACTIVITY_STREAM_API_RETRY_BACKOFF_FACTOR', 0.2
+)
+
+# search
+SEARCH_RESULTS_CACHE_EXPIRE_SECONDS = env.int(
+    'SEARCH_RESULTS_CACHE_EXPIRE_SECONDS', 60 * 5
+)
+SEARCH_ERROR_CACHE_EXPIRE_SECONDS = env.int(
+    'SEARCH_ERROR_CACHE_EXPIRE_SECONDS', 10
+)
+SEARCH_MAX_PAGE = env.int('SEARCH_MAX_PAGE', 100)
+SEARCH_SUGGEST_SIZE = env.int('SEARCH_SUGGEST_SIZE', 5)
+SEARCH_SUGGEST_MIN_LENGTH = env.int('SEARCH_SUGGEST_MIN_LENGTH', 3)
+SEARCH_SUGGEST_CACHE_MAX_SIZE = env.int('SEARCH_SUGGEST_CACHE_MAX_SIZE', 1000)
+SEARCH_SUGGEST_CACHE_EXPIRE_SECONDS = env.int(
+    'SEARCH_SUGGEST_CACHE_EXPIRE_SECONDS', 60 * 5
+)
+SEARCH_SUGGEST_DEBOUNCE_SECONDS = env.float(
+    'SEARCH_SUGGEST_DEBOUNCE_SECONDS', 0.3
+)
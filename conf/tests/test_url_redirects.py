@@ -4,10 +4,24 @@ from django.core.urlresolvers import reverse
 
 import pytest
 
-from conf.url_redirects import (
-    TOS_AND_PRIVACY_REDIRECT_LANGUAGES,
-    INTERNATIONAL_LANGUAGE_REDIRECTS_MAPPING,
-    INTERNATIONAL_COUNTRY_REDIRECTS_MAPPING
+
+# (<lang code path>, <language to use in query parameter>)
+INTERNATIONAL_LANGUAGE_REDIRECTS_MAPPING = [
+    ('de', 'de'),
+    ('ar', 'ar'),
+    ('zh', 'zh-hans'),
+    ('pt', 'pt'),
+    ('es', 'es'),
+    ('ja', 'ja'),
+]
+# (<country code path>, <language to use in query parameter>)
+INTERNATIONAL_COUNTRY_REDIRECTS_MAPPING = [
+    ('cn', 'zh-hans'),
+    ('br', 'pt'),
+    ('jp', 'ja'),
+]
+TOS_AND_PRIVACY_REDIRECT_LANGUAGES = (
+    'zh', 'ja', r'es', 'pt', 'ar', 'de'
 )
 
 
@@ -36,6 +36,11 @@ healthcheck_urls = [
         directory_healthcheck.views.PingView.as_view(),
         name='ping'
     ),
+    url(
+        r'^pools/$',
+        core.views.PoolStatsView.as_view(),
+        name='pools'
+    ),
 ]
 
 
@@ -200,7 +205,12 @@ urlpatterns = [
         r'^search/$',
         core.views.SearchView.as_view(),
         name='search'
-    )
+    ),
+    url(
+        r'^search/suggest/$',
+        core.views.SearchSuggestApiView.as_view(),
+        name='search-suggest'
+    ),
 
 ]
 
@@ -510,6 +520,11 @@ contact_urls = [
         core.views.CompaniesHouseSearchApiView.as_view(),
         name='api-internal-companies-house-search'
     ),
+    url(
+        r'^api/internal/cms-cache-invalidation/$',
+        core.views.CMSCacheInvalidationApiView.as_view(),
+        name='api-internal-cms-cache-invalidation'
+    ),
 ]
 
 marketaccess_urls = [
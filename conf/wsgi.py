@@ -16,3 +16,6 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings")
 
 application = get_wsgi_application()
 application = DjangoWhiteNoise(application)
+
+from core.redirects import install_reload_signal_handler  # noqa
+install_reload_signal_handler()
@@ -5,12 +5,26 @@ import pytest
 
 from django.core.cache import cache
 
+from core.cache import cms_page_cache
+from core.company_index import company_name_index
+from core.helpers import (
+    companies_house_search,
+    geoip_country_reader,
+    get_internal_ch_client,
+    search_suggester,
+)
 from sso.utils import SSOUser
 
 
 @pytest.fixture(autouse=True)
 def clear_django_cache():
     cache.clear()
+    cms_page_cache.clear_local()
+    geoip_country_reader.lookups.clear()
+    search_suggester.clear()
+    companies_house_search.clear()
+    get_internal_ch_client.cache_clear()
+    company_name_index.reset()
 
 
 @pytest.fixture
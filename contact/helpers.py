@@ -1,15 +1,144 @@
+import functools
+import json
+import logging
+import re
+import time
+
 from directory_api_client.client import api_client
 
 from django.conf import settings
+from django.core.cache import cache
 import requests.exceptions
 
 
-def retrieve_regional_offices(postcode):
-    response = api_client.exporting.lookup_regional_offices_by_postcode(
-        postcode
+logger = logging.getLogger(__name__)
+
+MESSAGE_DIRECTORY_REFRESH_FAILED = (
+    'Failed to refresh the regional office directory. Using stale offices.'
+)
+OFFICE_DIRECTORY_CACHE_KEY = 'regional-offices-directory'
+POSTCODE_PATTERN = re.compile(
+    r'^(?P<outward>(?P<area>[A-Z]{1,2})[0-9][A-Z0-9]?)[0-9][A-Z]{2}$'
+)
+
+
+def normalise_postcode(postcode):
+    # 'sw1a 1aa', 'SW1A1AA' and 'SW1A-1AA' are the same postcode
+    return ''.join(
+        character for character in postcode if character.isalnum()
+    ).upper()
+
+
+def build_regional_offices_cache_key(postcode):
+    return 'regional-offices:' + normalise_postcode(postcode)
+
+
+@functools.lru_cache(maxsize=None)
+def load_postcode_regions(path):
+    """Returns the region of each postcode area and district listed in the
+    bundled data file, loaded once per process.
+
+    """
+
+    with open(path) as f:
+        data = json.load(f)
+    regions = {}
+    for region_id, codes in data.items():
+        for code in codes['areas'] + codes['districts']:
+            regions[code] = region_id
+    return regions
+
+
+def get_postcode_region(postcode):
+    """Returns the region id of a full UK postcode, or None if the postcode is
+    not valid or its area is not in the postcode regions file.
+
+    """
+
+    match = POSTCODE_PATTERN.match(normalise_postcode(postcode))
+    if not match:
+        return None
+    regions = load_postcode_regions(
+        settings.REGIONAL_OFFICES_POSTCODE_REGIONS_FILE
+    )
+    # districts are listed where their area spans more than one region
+    return (
+        regions.get(match.group('outward')) or regions.get(match.group('area'))
     )
-    response.raise_for_status()
-    return response.json()
+
+
+def save_office_directory(offices):
+    # kept until replaced, so a stale directory outlives directory-api errors
+    cache.set(OFFICE_DIRECTORY_CACHE_KEY, {
+        'offices': [
+            {key: value for key, value in office.items() if key != 'is_match'}
+            for office in offices
+        ],
+        'fetched_at': time.time(),
+    }, None)
+
+
+def match_offices(directory, region_id):
+    if not any(
+        office.get('region_id') == region_id
+        for office in directory['offices']
+    ):
+        return None
+    return [
+        {**office, 'is_match': office.get('region_id') == region_id}
+        for office in directory['offices']
+    ]
+
+
+def lookup_regional_offices(postcode):
+    # cached so the views and forms handling one submission share a single
+    # call to directory-api. Errors are not cached
+    cache_key = build_regional_offices_cache_key(postcode)
+    offices = cache.get(cache_key)
+    if offices is None:
+        response = api_client.exporting.lookup_regional_offices_by_postcode(
+            postcode
+        )
+        response.raise_for_status()
+        offices = response.json()
+        cache.set(
+            cache_key, offices, settings.REGIONAL_OFFICES_CACHE_EXPIRE_SECONDS
+        )
+        # every lookup lists all of the offices
+        save_office_directory(offices)
+    return offices
+
+
+def retrieve_regional_offices(postcode):
+    """Returns every regional office, flagging those that cover `postcode`.
+
+    Postcodes in the bundled postcode regions file are matched in-process
+    against the office directory, the list of offices that each
+    directory-api lookup returns. The API is only called for other
+    postcodes, or to refresh a directory older than
+    REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS, and if that refresh fails
+    the stale directory is used.
+
+    """
+
+    region_id = get_postcode_region(postcode)
+    directory = cache.get(OFFICE_DIRECTORY_CACHE_KEY)
+    offices = None
+    if region_id and directory:
+        offices = match_offices(directory, region_id)
+        age = time.time() - directory['fetched_at']
+        if (
+            offices is not None and
+            age < settings.REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS
+        ):
+            return offices
+    try:
+        return lookup_regional_offices(postcode)
+    except requests.exceptions.RequestException:
+        if offices is None:
+            raise
+        logger.warning(MESSAGE_DIRECTORY_REFRESH_FAILED, exc_info=True)
+        return offices
 
 
 def retrieve_exporting_advice_email(postcode):
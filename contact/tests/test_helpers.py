@@ -1,3 +1,7 @@
+import json
+import re
+from unittest import mock
+
 import requests.exceptions
 import requests_mock
 import pytest
@@ -159,6 +163,159 @@ def test_retrieve_exporting_advice_email_success():
     assert email == 'region@example.com'
 
 
+def test_retrieve_regional_offices_cached():
+    url = api_client.exporting.endpoints['lookup-by-postcode'].format(
+        postcode='ABC123'
+    )
+    match_office = [{'is_match': True, 'email': 'region@example.com'}]
+    with requests_mock.mock() as mock:
+        mock.get(url, status_code=200, json=match_office)
+
+        for postcode in ('ABC123', 'abc 123', ' Abc-123 '):
+            assert helpers.retrieve_regional_offices(postcode) == (
+                match_office
+            )
+
+    assert mock.call_count == 1
+
+
+def test_retrieve_regional_offices_does_not_cache_errors():
+    url = api_client.exporting.endpoints['lookup-by-postcode'].format(
+        postcode='ABC123'
+    )
+    with requests_mock.mock() as mock:
+        mock.get(url, status_code=500)
+
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError):
+                helpers.retrieve_regional_offices('ABC123')
+
+    assert mock.call_count == 2
+
+
+@pytest.mark.parametrize('postcode,region_id', (
+    ('LE19 1RJ', 'east_midlands'),
+    ('de14 1aa', 'west_midlands'),
+    ('SW1A 1AA', 'london'),
+    ('TN16 3AA', 'london'),
+    ('TN1 1AA', 'south_east'),
+    ('OL14 5AA', 'yorkshire_and_the_humber'),
+    ('OL1 1AA', 'north_west'),
+    ('EH1 1AA', None),
+    ('LE19', None),
+    ('FOOBAR', None),
+))
+def test_get_postcode_region(postcode, region_id):
+    assert helpers.get_postcode_region(postcode) == region_id
+
+
+def test_postcode_regions_file(settings):
+    with open(settings.REGIONAL_OFFICES_POSTCODE_REGIONS_FILE) as f:
+        data = json.load(f)
+
+    codes = []
+    for region in data.values():
+        assert all(re.match(r'^[A-Z]{1,2}$', area) for area in region['areas'])
+        assert all(
+            re.match(r'^[A-Z]{1,2}[0-9][A-Z0-9]?$', district)
+            for district in region['districts']
+        )
+        codes += region['areas'] + region['districts']
+    assert len(codes) == len(set(codes))
+
+
+def mock_lookup_by_postcode(mock, postcode, **kwargs):
+    url = api_client.exporting.endpoints['lookup-by-postcode'].format(
+        postcode=postcode
+    )
+    mock.get(url, **kwargs)
+
+
+def test_retrieve_regional_offices_matched_locally(all_offices):
+    with requests_mock.mock() as mock:
+        mock_lookup_by_postcode(mock, 'LE191RJ', json=all_offices)
+
+        assert helpers.retrieve_regional_offices('LE191RJ') == all_offices
+        assert helpers.retrieve_regional_offices('LE1 1AA') == all_offices
+        offices = helpers.retrieve_regional_offices('B1 1AA')
+
+    assert mock.call_count == 1
+    assert [office['is_match'] for office in offices] == [False, True]
+    assert helpers.retrieve_exporting_advice_email('B1 1AA') == (
+        'test+west_midlands@examoke.com'
+    )
+
+
+def test_retrieve_regional_offices_unknown_region(all_offices):
+    with requests_mock.mock() as mock:
+        mock_lookup_by_postcode(mock, 'LE191RJ', json=all_offices)
+        mock_lookup_by_postcode(mock, 'SW1A1AA', json=all_offices)
+
+        helpers.retrieve_regional_offices('LE191RJ')
+        helpers.retrieve_regional_offices('SW1A1AA')
+
+    assert mock.call_count == 2
+
+
+def test_retrieve_regional_offices_directory_without_region_ids(all_offices):
+    offices = [
+        {key: value for key, value in office.items() if key != 'region_id'}
+        for office in all_offices
+    ]
+    with requests_mock.mock() as mock:
+        mock_lookup_by_postcode(mock, 'LE191RJ', json=offices)
+        mock_lookup_by_postcode(mock, 'B11AA', json=offices)
+
+        helpers.retrieve_regional_offices('LE191RJ')
+        assert helpers.retrieve_regional_offices('B11AA') == offices
+
+    assert mock.call_count == 2
+
+
+@mock.patch('time.time')
+def test_retrieve_regional_offices_refreshes_directory(
+    mock_time, all_offices, settings
+):
+    settings.REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS = 100
+    mock_time.return_value = 1000
+    with requests_mock.mock() as mock:
+        mock_lookup_by_postcode(mock, 'LE191RJ', json=all_offices)
+        mock_lookup_by_postcode(mock, 'B11AA', json=all_offices)
+
+        helpers.retrieve_regional_offices('LE191RJ')
+        mock_time.return_value = 1099
+        helpers.retrieve_regional_offices('B11AA')
+        assert mock.call_count == 1
+
+        mock_time.return_value = 1100
+        helpers.retrieve_regional_offices('B11AA')
+        assert mock.call_count == 2
+
+
+@mock.patch('time.time')
+def test_retrieve_regional_offices_stale_directory_on_error(
+    mock_time, all_offices, settings, caplog
+):
+    settings.REGIONAL_OFFICES_DIRECTORY_REFRESH_SECONDS = 100
+    mock_time.return_value = 1000
+    with requests_mock.mock() as mock:
+        mock_lookup_by_postcode(mock, 'LE191RJ', json=all_offices)
+        mock_lookup_by_postcode(mock, 'B11AA', status_code=500)
+        mock_lookup_by_postcode(mock, 'EH11AA', status_code=500)
+
+        helpers.retrieve_regional_offices('LE191RJ')
+        mock_time.return_value = 2000
+        offices = helpers.retrieve_regional_offices('B11AA')
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            helpers.retrieve_regional_offices('EH11AA')
+
+    assert [office['is_match'] for office in offices] == [False, True]
+    assert helpers.MESSAGE_DIRECTORY_REFRESH_FAILED in [
+        record.msg for record in caplog.records
+    ]
+
+
 def test_format_office_details(
         office_formatted,
         office_unformatted,
@@ -1082,6 +1082,16 @@ def test_office_finder_contact_feature_off(client, settings):
     assert response.status_code == 404
 
 
+@mock.patch('contact.helpers.retrieve_exporting_advice_email')
+def test_office_finder_contact_agent_email_retrieved_once(mock_retrieve):
+    mock_retrieve.return_value = 'regional@example.com'
+    view = views.OfficeContactFormView(kwargs={'postcode': 'FOOBAR'})
+
+    assert view.agent_email == 'regional@example.com'
+    assert view.notify_settings.agent_email == 'regional@example.com'
+    assert mock_retrieve.call_count == 1
+
+
 def test_contact_us_office_success_feature_off(client, settings):
     settings.FEATURE_FLAGS['OFFICE_FINDER_ON'] = False
 
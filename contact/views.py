@@ -608,7 +608,7 @@ class OfficeContactFormView(
     def flag(self):
         return settings.FEATURE_FLAGS['OFFICE_FINDER_ON']
 
-    @property
+    @cached_property
     def agent_email(self):
         return helpers.retrieve_exporting_advice_email(self.kwargs['postcode'])
 
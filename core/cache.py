@@ -0,0 +1,369 @@
+import collections
+import copy
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import os
+import threading
+import time
+
+from directory_cms_client.client import cms_api_client
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """Bounded, thread-safe, in-process cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once `max_size` is reached,
+    and are treated as missing once `timeout` seconds have passed. Values are
+    returned as stored, not copied, so callers must not mutate them.
+
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                expires_at, value = self.entries[key]
+            except KeyError:
+                return None
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ReloadableFile:
+    """Base for a process-wide value loaded from a file that another process
+    may replace, such as a database swapped in by a management command.
+
+    The file's inode and modification time are checked at most once every
+    `check_interval` seconds, and the value is loaded again when they change
+    or when a reload has been requested, for example on SIGHUP. Once a value
+    has been loaded, callers arriving during a reload keep using it.
+
+    Subclasses implement `load`. A load that raises is retried on the next
+    call.
+
+    """
+
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self.reset()
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Returns the value read from the file at `self.path`."""
+
+        raise NotImplementedError
+
+    def request_reload(self, *args):
+        # also used as a signal handler, so must only set a flag
+        self.is_reload_requested = True
+
+    def get_file_id(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def is_check_due(self):
+        return (
+            self.is_reload_requested or
+            time.monotonic() - self.checked_at >= self.check_interval
+        )
+
+    def check(self):
+        is_reload_requested = self.is_reload_requested
+        self.is_reload_requested = False
+        self.checked_at = time.monotonic()
+        file_id = self.get_file_id()
+        if is_reload_requested or file_id != self.file_id:
+            try:
+                self.value = self.load()
+            except BaseException:
+                self.is_reload_requested = True
+                raise
+            self.file_id = file_id
+            self.is_loaded = True
+
+    def get(self):
+        if self.is_check_due() and self.lock.acquire(
+            blocking=not self.is_loaded
+        ):
+            try:
+                if self.is_check_due():
+                    self.check()
+            finally:
+                self.lock.release()
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.file_id = None
+        self.checked_at = None
+        self.is_loaded = False
+        self.is_reload_requested = True
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls within the process into one.
+
+    The first caller for a key runs the function, and callers arriving while
+    it is in flight wait for and share its result or exception.
+
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self.lock:
+            future = self.calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self.calls[key] = Future()
+        if not is_leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exception:
+            future.set_exception(exception)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+class CMSPageCache:
+    """Read-through, stale-while-revalidate cache of parsed CMS pages.
+
+    Lookups are served from a process-local LRU, then from the shared cache,
+    and only then from the CMS. Draft previews are never cached.
+
+    Once a page is older than CMS_PAGE_CACHE_EXPIRE_SECONDS it is still
+    served, but a refresh is queued on a background thread pool. A lock in
+    the shared cache ensures only one worker refreshes a given page.
+
+    Identical CMS requests in flight at the same time within the process,
+    including draft previews, share a single upstream call.
+
+    Every caller gets its own copy of the page, as views add to the page
+    they are given.
+
+    """
+
+    TIERS = ('local', 'shared')
+    MESSAGE_REFRESH_FAILED = 'Failed to refresh cached CMS page'
+
+    def __init__(self, local_cache, shared_cache_alias='default'):
+        self.local_cache = local_cache
+        self.shared_cache_alias = shared_cache_alias
+        self.counters = collections.Counter()
+        self.counters_lock = threading.Lock()
+        self.in_flight = SingleFlight()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.CMS_PAGE_CACHE_REFRESH_WORKERS
+        )
+
+    @property
+    def shared_cache(self):
+        return caches[self.shared_cache_alias]
+
+    @property
+    def stats(self):
+        with self.counters_lock:
+            return {
+                tier: {
+                    'hits': self.counters[(tier, 'hits')],
+                    'misses': self.counters[(tier, 'misses')],
+                }
+                for tier in self.TIERS
+            }
+
+    def record(self, tier, outcome):
+        with self.counters_lock:
+            self.counters[(tier, outcome)] += 1
+
+    @staticmethod
+    def build_key(method_name, slug, language_code=None, service_name=None):
+        return ':'.join([
+            'cms-page',
+            method_name,
+            service_name or settings.DIRECTORY_CMS_API_CLIENT_SERVICE_NAME,
+            language_code or '',
+            slug,
+        ])
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry['fresh_until'] > time.time()
+
+    def get(self, key):
+        local_entry = self.local_cache.get(key)
+        if local_entry is not None and self.is_fresh(local_entry):
+            self.record('local', 'hits')
+            return local_entry
+        self.record('local', 'misses')
+        shared_entry = self.shared_cache.get(key)
+        if shared_entry is not None:
+            self.record('shared', 'hits')
+            self.local_cache.set(key, shared_entry)
+            return shared_entry
+        self.record('shared', 'misses')
+        return local_entry
+
+    def set(self, key, page):
+        fresh_for = settings.CMS_PAGE_CACHE_EXPIRE_SECONDS
+        stale_for = settings.CMS_PAGE_CACHE_STALE_SECONDS
+        entry = {'page': page, 'fresh_until': time.time() + fresh_for}
+        self.shared_cache.set(key, entry, fresh_for + stale_for)
+        self.local_cache.set(key, entry)
+
+    def delete(self, key):
+        self.shared_cache.delete(key)
+        self.local_cache.delete(key)
+
+    def evict(self, method_name, slug, service_name=None):
+        """Deletes every language variant of a page, returning the keys."""
+
+        language_codes = [''] + [code for code, _ in settings.LANGUAGES]
+        keys = [
+            self.build_key(
+                method_name,
+                slug=slug,
+                language_code=language_code,
+                service_name=service_name,
+            )
+            for language_code in language_codes
+        ]
+        self.shared_cache.delete_many(keys)
+        for key in keys:
+            self.local_cache.delete(key)
+        return keys
+
+    def clear_local(self):
+        self.local_cache.clear()
+        with self.counters_lock:
+            self.counters.clear()
+
+    def request(self, method_name, handler, **kwargs):
+        lookup = getattr(cms_api_client, method_name)
+        in_flight_key = (method_name, handler, frozenset(kwargs.items()))
+        return self.in_flight.do(
+            in_flight_key, lambda: handler(lookup(**kwargs))
+        )
+
+    def fetch(self, key, method_name, handler, **kwargs):
+        page = self.request(method_name, handler, draft_token=None, **kwargs)
+        self.set(key, page)
+        return page
+
+    def warm(self, method_name, handler, **kwargs):
+        """Fetches a page into the cache unless the shared cache already
+        holds a fresh copy. Returns whether the page was fetched.
+
+        """
+
+        key = self.build_key(method_name, **kwargs)
+        entry = self.shared_cache.get(key)
+        if entry is not None and self.is_fresh(entry):
+            return False
+        self.fetch(key, method_name, handler, **kwargs)
+        return True
+
+    def refresh(self, key, lock_key, method_name, handler, **kwargs):
+        try:
+            self.fetch(key, method_name, handler, **kwargs)
+        except Http404:
+            self.delete(key)
+        except Exception:
+            logger.error(
+                self.MESSAGE_REFRESH_FAILED, extra={'key': key}, exc_info=True
+            )
+        finally:
+            self.shared_cache.delete(lock_key)
+
+    def schedule_refresh(self, key, method_name, handler, **kwargs):
+        lock_key = 'lock:' + key
+        is_locked = self.shared_cache.add(
+            lock_key, True, settings.DIRECTORY_CMS_API_CLIENT_DEFAULT_TIMEOUT
+        )
+        if is_locked:
+            self.executor.submit(
+                self.refresh, key, lock_key, method_name, handler, **kwargs
+            )
+
+    def lookup(self, method_name, handler, draft_token, **kwargs):
+        page = self.lookup_shared(
+            method_name, handler, draft_token=draft_token, **kwargs
+        )
+        return copy.deepcopy(page)
+
+    def lookup_shared(self, method_name, handler, draft_token, **kwargs):
+        if draft_token:
+            return self.request(
+                method_name, handler, draft_token=draft_token, **kwargs
+            )
+        key = self.build_key(method_name, **kwargs)
+        entry = self.get(key)
+        if entry is None:
+            return self.fetch(key, method_name, handler, **kwargs)
+        if not self.is_fresh(entry):
+            self.schedule_refresh(key, method_name, handler, **kwargs)
+        return entry['page']
+
+
+cms_page_cache = CMSPageCache(
+    local_cache=LocalLRUCache(
+        max_size=settings.CMS_PAGE_LOCAL_CACHE_MAX_SIZE,
+        timeout=settings.CMS_PAGE_LOCAL_CACHE_EXPIRE_SECONDS,
+    ),
+)
+
+
+def lookup_by_slug(handler, draft_token=None, **kwargs):
+    return cms_page_cache.lookup(
+        'lookup_by_slug', handler=handler, draft_token=draft_token, **kwargs
+    )
+
+
+def lookup_by_tag(handler, draft_token=None, **kwargs):
+    return cms_page_cache.lookup(
+        'lookup_by_tag', handler=handler, draft_token=draft_token, **kwargs
+    )
@@ -0,0 +1,253 @@
+import bisect
+import contextlib
+import csv
+import heapq
+import io
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zipfile
+
+from django.conf import settings
+
+from core.cache import ReloadableFile
+
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'CHNAMES1'
+HEADER = struct.Struct('<8sI')
+OFFSET = struct.Struct('<I')
+FIELD_SEPARATOR = b'\t'
+RECORD_SEPARATOR = b'\n'
+# number of sort keys held in memory while writing an index
+SORT_RUN_SIZE = 200000
+# columns of the Companies House "Free Company Data Product" CSV
+BULK_COLUMNS = {
+    'title': 'CompanyName',
+    'company_number': 'CompanyNumber',
+    'company_status': 'CompanyStatus',
+    'postal_code': 'RegAddress.PostCode',
+}
+
+
+def normalise_name(name):
+    return ' '.join(name.split()).lower()
+
+
+def clean_field(value):
+    return ' '.join(value.split())
+
+
+def read_bulk_companies(path):
+    """Yields the companies in a Companies House bulk data CSV, or in the
+    zip archive it is published in, without reading it all into memory.
+
+    """
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            name = next(
+                name for name in archive.namelist()
+                if name.lower().endswith('.csv')
+            )
+            with archive.open(name) as binary_file:
+                text_file = io.TextIOWrapper(binary_file, encoding='utf-8')
+                yield from read_bulk_csv(text_file)
+    else:
+        with open(path, encoding='utf-8', newline='') as text_file:
+            yield from read_bulk_csv(text_file)
+
+
+def read_bulk_csv(text_file):
+    reader = csv.reader(text_file)
+    # some header names in the bulk data are padded with spaces
+    header = [name.strip() for name in next(reader)]
+    positions = {
+        field: header.index(column) for field, column in BULK_COLUMNS.items()
+    }
+    for row in reader:
+        yield {
+            field: clean_field(row[position])
+            for field, position in positions.items()
+        }
+
+
+def write_sorted_run(keys):
+    keys.sort()
+    # only "\n" separates lines, as names may hold other line breaks
+    run = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='\n')
+    for key, company_number, offset in keys:
+        run.write('{}\t{}\t{}\n'.format(key, company_number, offset))
+    run.seek(0)
+    return run
+
+
+def read_sorted_run(run):
+    for line in run:
+        key, company_number, offset = line[:-1].split('\t')
+        yield key, company_number, int(offset)
+
+
+def write_index(path, companies, run_size=SORT_RUN_SIZE):
+    """Writes a name index of `companies` to `path`, replacing any existing
+    index atomically.
+
+    Records are written in the order given, to a temporary file. Their sort
+    keys are sorted in runs of `run_size` that are spilled to temporary
+    files and merged, so memory use is bounded by `run_size` rather than the
+    number of companies. Temporary disk space of about twice the size of the
+    index is needed.
+
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    count = 0
+    with contextlib.ExitStack() as stack:
+        records = stack.enter_context(tempfile.TemporaryFile())
+        runs = []
+        keys = []
+        for company in companies:
+            key = normalise_name(company['title'])
+            if not key:
+                continue
+            fields = [
+                key,
+                company['title'],
+                company['company_number'],
+                company['company_status'],
+                company['postal_code'],
+            ]
+            keys.append((key, company['company_number'], records.tell()))
+            records.write(
+                FIELD_SEPARATOR.join(field.encode() for field in fields) +
+                RECORD_SEPARATOR
+            )
+            count += 1
+            if len(keys) == run_size:
+                runs.append(stack.enter_context(write_sorted_run(keys)))
+                keys = []
+        runs.append(stack.enter_context(write_sorted_run(keys)))
+        records.seek(0)
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=os.path.basename(path), delete=False
+        )
+        try:
+            with temp_file:
+                temp_file.write(HEADER.pack(MAGIC, count))
+                sorted_keys = heapq.merge(*map(read_sorted_run, runs))
+                for _, _, offset in sorted_keys:
+                    temp_file.write(OFFSET.pack(offset))
+                while True:
+                    chunk = records.read(64 * 1024)
+                    if not chunk:
+                        break
+                    temp_file.write(chunk)
+            os.chmod(temp_file.name, 0o644)
+            os.replace(temp_file.name, path)
+        except BaseException:
+            os.remove(temp_file.name)
+            raise
+    return count
+
+
+class MappedIndex:
+    """Sorted company names in a memory-mapped index file, searched by
+    binary search over the offsets table without loading it into memory.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(path + ' is not a company name index')
+        self.records_start = HEADER.size + self.count * OFFSET.size
+        if len(self.map) < self.records_start:
+            raise ValueError(path + ' is truncated')
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        # the keys, for bisect
+        start = self.get_record_start(position)
+        return self.map[start:self.map.find(FIELD_SEPARATOR, start)]
+
+    def get_record_start(self, position):
+        offset, = OFFSET.unpack_from(
+            self.map, HEADER.size + position * OFFSET.size
+        )
+        return self.records_start + offset
+
+    def get_item(self, position):
+        start = self.get_record_start(position)
+        end = self.map.find(RECORD_SEPARATOR, start)
+        _, title, company_number, company_status, postal_code = (
+            self.map[start:end].decode().split('\t')
+        )
+        return {
+            'title': title,
+            'company_number': company_number,
+            'company_status': company_status,
+            'address': {'postal_code': postal_code},
+        }
+
+    def search(self, term, limit):
+        prefix = normalise_name(term).encode()
+        position = bisect.bisect_left(self, prefix)
+        items = []
+        while (
+            position < self.count and len(items) < limit and
+            self[position].startswith(prefix)
+        ):
+            items.append(self.get_item(position))
+            position += 1
+        return items
+
+
+class CompanyNameIndex(ReloadableFile):
+    """Optional, process-wide local index of company names, answering
+    name prefix searches without a call to Companies House.
+
+    The index file is built by build_companies_house_index, is
+    memory-mapped on first use, and a rebuilt index is picked up without a
+    restart. Without an index file every search is a miss, and an index
+    file that cannot be read is logged and the previous index kept.
+
+    """
+
+    MESSAGE_LOAD_FAILED = 'Failed to load the company name index'
+
+    def load(self):
+        try:
+            return MappedIndex(self.path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error):
+            logger.error(self.MESSAGE_LOAD_FAILED, exc_info=True)
+            return self.value
+
+    def get(self):
+        if self.path:
+            return super().get()
+
+    def search(self, term, limit):
+        """Returns up to `limit` companies whose name starts with `term`, in
+        name order, or None if the index has no match.
+
+        """
+
+        index = self.get()
+        if index:
+            return index.search(term, limit) or None
+
+
+company_name_index = CompanyNameIndex(
+    path=settings.COMPANIES_HOUSE_INDEX_FILE,
+    check_interval=settings.COMPANIES_HOUSE_INDEX_RELOAD_CHECK_SECONDS,
+)
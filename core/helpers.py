@@ -1,24 +1,33 @@
 import collections
+import hashlib
 import http
 import urllib.parse
 import re
 import json
+import os
 import requests
 from math import ceil
-from functools import partial
+from functools import lru_cache, partial
 from urllib.parse import urljoin
 
-from directory_api_client.client import api_client
 from directory_ch_client.company import CompanyCHClient
 from ipware import get_client_ip
 
 from django.conf import settings
 from django.contrib.gis.geoip2 import GeoIP2
+from django.core import signing
+from django.core.cache import cache
 from django.urls import reverse
 from django.shortcuts import Http404, redirect
 from django.utils.functional import cached_property
 from django.utils import translation
-from mohawk import Sender
+from mohawk import Receiver, Sender
+from mohawk.exc import CredentialsLookupError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.cache import LocalLRUCache, ReloadableFile, SingleFlight
+from core.company_index import company_name_index
 
 
 NotifySettings = collections.namedtuple(
@@ -87,6 +96,82 @@ def handle_cms_response_allow_404(response):
     return response.json()
 
 
+def lookup_cms_webhook_credentials(access_key_id):
+    if (
+        not settings.CMS_WEBHOOK_HAWK_SECRET_KEY or
+        access_key_id != settings.CMS_WEBHOOK_HAWK_ACCESS_KEY
+    ):
+        raise CredentialsLookupError(access_key_id)
+    return {
+        'id': settings.CMS_WEBHOOK_HAWK_ACCESS_KEY,
+        'key': settings.CMS_WEBHOOK_HAWK_SECRET_KEY,
+        'algorithm': 'sha256',
+    }
+
+
+def seen_cms_webhook_nonce(access_key_id, nonce, timestamp):
+    cache_key = 'cms-webhook-nonce:{id}:{nonce}'.format(
+        id=access_key_id, nonce=nonce
+    )
+    # Hawk rejects timestamps more than 60 seconds out, so a nonce only needs
+    # remembering for that long.
+    return not cache.add(cache_key, True, 60)
+
+
+def authenticate_cms_webhook(request):
+    """Verifies the Hawk signature of a request sent by the CMS, raising
+    mohawk.exc.HawkFail if it is not valid.
+
+    """
+
+    return Receiver(
+        lookup_cms_webhook_credentials,
+        request.META.get('HTTP_AUTHORIZATION'),
+        request.build_absolute_uri(),
+        request.method,
+        content=request.body,
+        content_type=request.content_type,
+        seen_nonce=seen_cms_webhook_nonce,
+    )
+
+
+class GeoIPCountryReader(ReloadableFile):
+    """Process-wide, thread-safe GeoIP country reader.
+
+    The MaxMind database is memory-mapped once, on first use, and recent
+    lookups are kept in an LRU cache so repeat visitors cost no file access.
+    The database is reopened once download_geolocation_data has swapped in a
+    new one.
+
+    """
+
+    def __init__(self, path, max_size, timeout, check_interval):
+        super().__init__(path=path, check_interval=check_interval)
+        self.lookups = LocalLRUCache(max_size=max_size, timeout=timeout)
+
+    def load(self):
+        geoip = GeoIP2(self.path, cache=GeoIP2.MODE_MMAP)
+        self.lookups.clear()
+        return geoip
+
+    def country(self, ip_address):
+        # checked first, as reopening the database clears the lookups
+        geoip = self.get()
+        response = self.lookups.get(ip_address)
+        if response is None:
+            response = geoip.country(ip_address)
+            self.lookups.set(ip_address, response)
+        return response
+
+
+geoip_country_reader = GeoIPCountryReader(
+    path=os.path.join(settings.GEOIP_PATH, settings.GEOIP_COUNTRY),
+    max_size=settings.GEOIP_LOOKUP_CACHE_MAX_SIZE,
+    timeout=settings.GEOIP_LOOKUP_CACHE_EXPIRE_SECONDS,
+    check_interval=settings.GEOIP_RELOAD_CHECK_SECONDS,
+)
+
+
 class GeoLocationRedirector:
     DOMESTIC_COUNTRY_CODES = ['GB', 'IE']
     COUNTRY_TO_LANGUAGE_MAP = {
@@ -101,11 +186,31 @@ class GeoLocationRedirector:
     def __init__(self, request):
         self.request = request
 
+    @property
+    def vary_headers(self):
+        headers = ['Cookie']
+        if settings.GEOLOCATION_COUNTRY_HEADER:
+            headers.append(settings.GEOLOCATION_COUNTRY_HEADER)
+        return headers
+
+    @property
+    def header_country_code(self):
+        # a country header set by the CDN avoids the GeoIP lookup
+        header = settings.GEOLOCATION_COUNTRY_HEADER
+        if header:
+            key = 'HTTP_' + header.upper().replace('-', '_')
+            value = self.request.META.get(key, '')
+            if re.fullmatch('[A-Za-z]{2}', value):
+                return value.upper()
+
     @cached_property
     def country_code(self):
+        header_country_code = self.header_country_code
+        if header_country_code:
+            return header_country_code
         client_ip, is_routable = get_client_ip(self.request)
         if client_ip and is_routable:
-            response = GeoIP2().country(client_ip)
+            response = geoip_country_reader.country(client_ip)
             return response['country_code']
 
     @property
@@ -141,15 +246,6 @@ class GeoLocationRedirector:
         return response
 
 
-def get_company_profile(request):
-    if request.sso_user:
-        response = api_client.company.retrieve_private_profile(
-            sso_session_id=request.sso_user.session_id,
-        )
-        if response.status_code == 200:
-            return response.json()
-
-
 class CompaniesHouseClient:
 
     api_key = settings.COMPANIES_HOUSE_API_KEY
@@ -173,10 +269,7 @@ class CompaniesHouseClient:
     @classmethod
     def search(cls, term):
         if settings.FEATURE_FLAGS['INTERNAL_CH_ON']:
-            companies_house_client = CompanyCHClient(
-                base_url=settings.INTERNAL_CH_BASE_URL,
-                api_key=settings.INTERNAL_CH_API_KEY
-            )
+            companies_house_client = get_internal_ch_client()
             return companies_house_client.search_companies(
                 query=term
             )
@@ -185,55 +278,220 @@ class CompaniesHouseClient:
             return cls.get(url, params={'q': term})
 
 
+class PooledCompanyCHClient(CompanyCHClient):
+    """CompanyCHClient that sends every request over one keep-alive session
+    instead of opening a new session, and connection, per request.
+
+    """
+
+    def __init__(self, session, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = session
+
+    def send(self, method, url, request=None, *args, **kwargs):
+        prepared_request = requests.Request(
+            method, url, *args, **kwargs
+        ).prepare()
+        signed_request = self.sign_request(prepared_request=prepared_request)
+        return self.session.send(signed_request, timeout=self.timeout)
+
+
+@lru_cache(maxsize=None)
+def get_internal_ch_client():
+    return PooledCompanyCHClient(
+        session=build_pooled_session(
+            pool_size=settings.INTERNAL_CH_POOL_SIZE,
+            max_retries=settings.INTERNAL_CH_MAX_RETRIES,
+            backoff_factor=settings.INTERNAL_CH_RETRY_BACKOFF_FACTOR,
+        ),
+        base_url=settings.INTERNAL_CH_BASE_URL,
+        api_key=settings.INTERNAL_CH_API_KEY,
+        sender_id=settings.INTERNAL_CH_SENDER_ID,
+        timeout=settings.INTERNAL_CH_DEFAULT_TIMEOUT,
+    )
+
+
+class CompaniesHouseSearch:
+    """Cached Companies House company search, for autocomplete.
+
+    Terms are answered from the local company name index when it has a
+    match, and from the Companies House API otherwise.
+
+    Items are cached per search term in a process-local LRU. Only the same
+    term is answered from the cache: Companies House also matches previous
+    names and normalises words such as "ltd", so the result of a narrower
+    term cannot be derived from a cached shorter one.
+
+    Concurrent searches from one client share the call already in flight.
+    A search that waited on a different term then makes its own call.
+
+    """
+
+    def __init__(self, max_size, timeout):
+        self.results = LocalLRUCache(max_size=max_size, timeout=timeout)
+        self.in_flight = SingleFlight()
+
+    @staticmethod
+    def normalise_term(term):
+        return ' '.join(term.split()).lower()
+
+    def fetch(self, term):
+        items = company_name_index.search(
+            term, limit=settings.COMPANIES_HOUSE_INDEX_SEARCH_LIMIT
+        )
+        if items is None:
+            response = CompaniesHouseClient.search(term=term)
+            response.raise_for_status()
+            items = response.json()['items']
+        self.results.set(term, items)
+        return items
+
+    def fetch_shared(self, term):
+        # the error is returned so callers waiting on another term can tell
+        # it isn't theirs
+        try:
+            return term, self.fetch(term)
+        except Exception as exception:
+            return term, exception
+
+    def search(self, term, client_id):
+        term = self.normalise_term(term)
+        items = self.results.get(term)
+        if items is not None:
+            return items
+        fetched_term, result = self.in_flight.do(
+            client_id, self.fetch_shared, term
+        )
+        if fetched_term == term:
+            if isinstance(result, Exception):
+                raise result
+            return result
+        # this request waited on an earlier keystroke from the same client
+        items = self.results.get(term)
+        if items is not None:
+            return items
+        return self.fetch(term)
+
+    def clear(self):
+        self.results.clear()
+
+
+companies_house_search = CompaniesHouseSearch(
+    max_size=settings.COMPANIES_HOUSE_SEARCH_CACHE_MAX_SIZE,
+    timeout=settings.COMPANIES_HOUSE_SEARCH_CACHE_EXPIRE_SECONDS,
+)
+
+
 ''' --- Search Helpers --- '''
 
 
+# Escape special characters
+# http://lucene.apache.org/core/old_versioned_docs/
+#   versions/2_9_1/queryparsersyntax.html#Escaping Special Characters
+LUCENE_SPECIAL_CHARACTERS_TABLE = str.maketrans({
+    character: '\\' + character for character in '\\+-&|!(){}[]^~*?:/'
+})
+# AND, OR and NOT are used by lucene as logical operators. We need
+# to escape them
+LUCENE_OPERATOR_PATTERN = re.compile(r'\s*\b(AND|OR|NOT)\b\s*')
+ODD_QUOTE_PATTERN = re.compile(r'(.*)"(.*)')
+
+
+def escape_lucene_operators(text):
+    # Matches the result of escaping each operator in its own pass: a space
+    # already added after an operator is reused by a different operator that
+    # directly follows it, but not by the same operator.
+    previous = {'end': None, 'operator': None}
+
+    def replace(match):
+        operator = match.group(1)
+        escaped = ''.join('\\' + letter for letter in operator)
+        if match.start() == previous['end'] and (
+            operator != previous['operator']
+        ):
+            replacement = escaped + ' '
+        else:
+            replacement = ' ' + escaped + ' '
+        previous.update(end=match.end(), operator=operator)
+        return replacement
+
+    return LUCENE_OPERATOR_PATTERN.sub(replace, text)
+
+
 def sanitise_query(text):
     """ Based on:
         https://gist.github.com/eranhirs/5c9ef5de8b8731948e6ed14486058842
     """
-    # Escape special characters
-    # http://lucene.apache.org/core/old_versioned_docs/
-    #   versions/2_9_1/queryparsersyntax.html#Escaping Special Characters
-    text = re.sub('([{}])'.format(
-        re.escape(r'\\+\-&|!(){}\[\]^~*?:\/')
-    ), r"\\\1", text)
-
-    # AND, OR and NOT are used by lucene as logical operators. We need
-    # to escape them
-    for word in ['AND', 'OR', 'NOT']:
-        escaped_word = "".join(["\\" + letter for letter in word])
-        text = re.sub(
-            r'\s*\b({})\b\s*'.format(word),
-            r" {} ".format(escaped_word),
-            text
-        )
+    text = escape_lucene_operators(
+        text.translate(LUCENE_SPECIAL_CHARACTERS_TABLE)
+    )
 
     # Escape odd quotes
     quote_count = text.count('"')
     if quote_count % 2 == 1:
-        return re.sub(r'(.*)"(.*)', r'\1\"\2', text)
+        return ODD_QUOTE_PATTERN.sub(r'\1\"\2', text)
     else:
         return text
 
 
 def sanitise_page(page):
     try:
-        return int(page) if int(page) > 0 else 1
+        page = int(page) if int(page) > 0 else 1
     except ValueError:
         return 1
+    # deep offsets are expensive for Elasticsearch to serve
+    return min(page, settings.SEARCH_MAX_PAGE)
 
 
 RESULTS_PER_PAGE = 10
+# only the fields the search results template renders are requested
+RESULT_FIELDS = ['type', 'name', 'content', 'url']
+SEARCH_CURSOR_SALT = 'core.helpers.search-cursor:'
+
+
+def build_search_cursor(query, page, search_after):
+    """Returns an opaque cursor for `page` of the results of `query`, holding
+    the sort values of the last hit on the page before it.
+
+    """
+
+    normalised_query = ' '.join(query.split())
+    return signing.dumps(
+        {'page': page, 'search_after': search_after},
+        salt=SEARCH_CURSOR_SALT + normalised_query,
+        compress=True,
+    )
+
+
+def parse_search_cursor(cursor, query, page):
+    """Returns the `search_after` values held by the cursor, or None if it
+    has been tampered with or was built for another query or page.
+
+    """
+
+    normalised_query = ' '.join(query.split())
+    try:
+        payload = signing.loads(
+            cursor, salt=SEARCH_CURSOR_SALT + normalised_query
+        )
+    except signing.BadSignature:
+        return None
+    if payload.get('page') != page:
+        return None
+    return payload.get('search_after')
 
 
 def parse_results(response, query, page):
     current_page = int(page)
 
     content = json.loads(response.content)
-    results = [hit['_source'] for hit in content['hits']['hits']]
+    hits = content['hits']['hits']
+    results = [hit['_source'] for hit in hits]
     total_results = content['hits']['total']
-    total_pages = int(ceil(total_results/float(RESULTS_PER_PAGE)))
+    total_pages = min(
+        int(ceil(total_results/float(RESULTS_PER_PAGE))),
+        settings.SEARCH_MAX_PAGE,
+    )
 
     prev_pages = list(range(1, current_page))[-3:]
     if (len(prev_pages) > 0) and (prev_pages[0] > 2):
@@ -248,10 +506,14 @@ def parse_results(response, query, page):
         show_last_page = False
 
     first_item_number = ((current_page-1)*RESULTS_PER_PAGE) + 1
-    if current_page == total_pages:
-        last_item_number = total_results
+    last_item_number = min(current_page*RESULTS_PER_PAGE, total_results)
+
+    if hits and 'sort' in hits[-1] and current_page < total_pages:
+        next_cursor = build_search_cursor(
+            query, current_page + 1, hits[-1]['sort']
+        )
     else:
-        last_item_number = (current_page)*RESULTS_PER_PAGE
+        next_cursor = None
 
     return {
        'query': query,
@@ -266,17 +528,22 @@ def parse_results(response, query, page):
        'show_first_page': show_first_page,
        'show_last_page': show_last_page,
        'first_item_number': first_item_number,
-       'last_item_number': last_item_number
+       'last_item_number': last_item_number,
+       'next_cursor': next_cursor,
     }
 
 
-def format_query(query, page):
+def format_query(query, page, size=RESULTS_PER_PAGE, search_after=None):
     """ formats query for ElasticSearch
     Note: ActivityStream not yet configured to recieve pagination,
     will be corrected shortly. Hence commented-out lines.
+
+    With `search_after`, the sort values of the last hit of the previous
+    page, the page is found by cursor rather than by offset, which costs
+    the same however deep the page is.
     """
-    from_result = (page - 1) * RESULTS_PER_PAGE
-    return json.dumps({
+    from_result = (page - 1) * size
+    body = {
         'query': {
           'bool': {
               'should': [
@@ -287,9 +554,81 @@ def format_query(query, page):
               ]
           }
         },
+        '_source': RESULT_FIELDS,
+        # the id breaks ties in score so that cursors are stable
+        'sort': [{'_score': 'desc'}, {'id': 'asc'}],
         'from': from_result,
-        'size': RESULTS_PER_PAGE
-    })
+        'size': size
+    }
+    if search_after is not None:
+        body['from'] = 0
+        body['search_after'] = search_after
+    return json.dumps(body)
+
+
+def build_pooled_session(pool_size, max_retries, backoff_factor):
+    """Returns a session that keeps connections alive between requests.
+
+    Only failed connections are retried, with backoff. Requests sent through
+    these sessions are Hawk-signed, and a resent request carries the same
+    nonce, so the server would reject a retry after it had seen the request
+    as a replay and mask the original error.
+
+    """
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=0,
+        backoff_factor=backoff_factor,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_pool_stats(session):
+    """Returns the usage of each connection pool of the session."""
+
+    stats = []
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            stats.append({
+                'host': pool.host,
+                'port': pool.port,
+                'pool_size': pool.pool.maxsize,
+                'connections_in_use': pool.pool.maxsize - pool.pool.qsize(),
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+            })
+    return stats
+
+
+activity_stream_session = build_pooled_session(
+    pool_size=settings.ACTIVITY_STREAM_API_POOL_SIZE,
+    max_retries=settings.ACTIVITY_STREAM_API_MAX_RETRIES,
+    backoff_factor=settings.ACTIVITY_STREAM_API_RETRY_BACKOFF_FACTOR,
+)
+
+
+def get_activity_stream_pool_stats():
+    return get_pool_stats(activity_stream_session)
+
+
+def build_search_cache_key(query, page):
+    normalised_query = ' '.join(query.split())
+    digest = hashlib.sha256(normalised_query.encode()).hexdigest()
+    return 'search-results:{page}:{digest}'.format(page=page, digest=digest)
 
 
 def search_with_activitystream(query):
@@ -320,4 +659,80 @@ def search_with_activitystream(query):
         'Content-Type': 'application/json'
     })
 
-    return requests.Session().send(request)
+    return activity_stream_session.send(
+        request,
+        timeout=(
+            settings.ACTIVITY_STREAM_API_CONNECT_TIMEOUT,
+            settings.ACTIVITY_STREAM_API_READ_TIMEOUT,
+        ),
+    )
+
+
+class SearchSuggester:
+    """Top hits for a partially typed query, for search-as-you-type.
+
+    Results are cached per query prefix in a process-local LRU, so popular
+    prefixes are only searched once. Each client triggers at most one
+    Activity Stream search per `debounce_seconds`: keystrokes inside that
+    window are answered from the longest cached prefix of the query and
+    flagged as debounced, so the client knows to ask again once typing
+    pauses.
+
+    """
+
+    def __init__(self, size, min_length, max_size, timeout, debounce_seconds):
+        self.size = size
+        self.min_length = min_length
+        self.results = LocalLRUCache(max_size=max_size, timeout=timeout)
+        self.recent_clients = LocalLRUCache(
+            max_size=max_size, timeout=debounce_seconds
+        )
+
+    @staticmethod
+    def normalise_query(query):
+        # Activity Stream's analyzer is case insensitive
+        return ' '.join(query.split()).lower()
+
+    def get_cached_prefix(self, query):
+        for end in range(len(query), self.min_length - 1, -1):
+            results = self.results.get(query[:end])
+            if results is not None:
+                return results
+        return []
+
+    def search(self, query):
+        response = search_with_activitystream(
+            format_query(query, page=1, size=self.size)
+        )
+        response.raise_for_status()
+        return parse_results(response, query, page=1)['results'][:self.size]
+
+    def suggest(self, query, client_id):
+        query = self.normalise_query(query)
+        if len(query) < self.min_length:
+            return {'results': [], 'is_debounced': False}
+        results = self.results.get(query)
+        if results is not None:
+            return {'results': results, 'is_debounced': False}
+        if self.recent_clients.get(client_id) is not None:
+            return {
+                'results': self.get_cached_prefix(query),
+                'is_debounced': True,
+            }
+        self.recent_clients.set(client_id, True)
+        results = self.search(query)
+        self.results.set(query, results)
+        return {'results': results, 'is_debounced': False}
+
+    def clear(self):
+        self.results.clear()
+        self.recent_clients.clear()
+
+
+search_suggester = SearchSuggester(
+    size=settings.SEARCH_SUGGEST_SIZE,
+    min_length=settings.SEARCH_SUGGEST_MIN_LENGTH,
+    max_size=settings.SEARCH_SUGGEST_CACHE_MAX_SIZE,
+    timeout=settings.SEARCH_SUGGEST_CACHE_EXPIRE_SECONDS,
+    debounce_seconds=settings.SEARCH_SUGGEST_DEBOUNCE_SECONDS,
+)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from core import company_index
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Build the local company name index used by the Companies House '
+        'search from the Companies House bulk company data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source',
+            help='Path of the bulk company data CSV, or its zip archive.',
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.COMPANIES_HOUSE_INDEX_FILE,
+            help='Path of the index file to write.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError(
+                'Set COMPANIES_HOUSE_INDEX_FILE or pass --output'
+            )
+        count = company_index.write_index(
+            path=options['output'],
+            companies=company_index.read_bulk_companies(options['source']),
+        )
+        self.stdout.write('Indexed {count} companies in {path}'.format(
+            count=count, path=options['output'],
+        ))
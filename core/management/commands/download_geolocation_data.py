@@ -1,10 +1,14 @@
 import abc
-import io
+import hashlib
+import json
 import logging
 import os
+import shutil
 import tarfile
+import tempfile
 
 import requests
+import urllib3
 
 from django.core.management import BaseCommand
 from django.conf import settings
@@ -13,8 +17,36 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
+class ChecksumReader:
+    """File-like wrapper that hashes everything read through it."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, file_like_object, algorithm):
+        self.file_like_object = file_like_object
+        self.hash = hashlib.new(algorithm)
+
+    def read(self, size=-1):
+        chunk = self.file_like_object.read(size)
+        self.hash.update(chunk)
+        return chunk
+
+    def read_remaining(self):
+        while self.read(self.chunk_size):
+            pass
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+
 class GeolocationArchiveBase(abc.ABC):
     location = abc.abstractproperty()
+    checksum_algorithm = 'md5'
+    is_not_modified = False
+    # ETag and Last-Modified of the archive the current database came from
+    validators_location = os.path.join(
+        settings.GEOIP_PATH, settings.GEOIP_COUNTRY + '.validators.json'
+    )
 
     def __init__(self):
         self.file_like_object = self.retrieve_file()
@@ -24,40 +56,133 @@ class GeolocationArchiveBase(abc.ABC):
     def retrieve_file(self):
         pass
 
+    def retrieve_checksum(self):
+        return None
+
+    def close(self):
+        self.file_like_object.close()
+
+    def read_validators(self):
+        try:
+            with open(self.validators_location) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get_validators(self):
+        return {}
+
+    def save_validators(self):
+        validators = self.get_validators()
+        if any(validators.values()):
+            temp_location = self.validators_location + '.tmp'
+            with open(temp_location, 'w') as f:
+                json.dump(validators, f)
+            os.replace(temp_location, self.validators_location)
+        elif os.path.exists(self.validators_location):
+            os.remove(self.validators_location)
+
+    def verify_checksum(self, reader):
+        # the checksum covers the whole archive, not just the database file
+        reader.read_remaining()
+        expected = self.retrieve_checksum()
+        if expected is not None and expected != reader.hexdigest():
+            raise ValueError('Geolocation archive checksum mismatch')
+
     def decompress(self, file_name, destination):
-        tar = tarfile.open(mode="r:gz", fileobj=self.file_like_object)
-        for member in tar.getmembers():
-            if member.name.endswith(file_name):
-                member.name = file_name
-                tar.extract(member, path=destination)
-                break
-        else:
-            raise ValueError(file_name + ' not found in geolocation archive')
+        """Streams the archive, extracting only `file_name`, and atomically
+        replaces the file in `destination` once the checksum is verified.
+
+        Returns False if the archive has not changed since the last download.
+
+        """
+
+        if self.is_not_modified:
+            self.close()
+            return False
+        os.makedirs(destination, exist_ok=True)
+        reader = ChecksumReader(self.file_like_object, self.checksum_algorithm)
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=destination, prefix=file_name, delete=False
+        )
+        try:
+            with temp_file, tarfile.open(mode='r|gz', fileobj=reader) as tar:
+                for member in tar:
+                    if member.isfile() and member.name.endswith(file_name):
+                        shutil.copyfileobj(tar.extractfile(member), temp_file)
+                        break
+                else:
+                    raise ValueError(
+                        file_name + ' not found in geolocation archive'
+                    )
+            self.verify_checksum(reader)
+            os.chmod(temp_file.name, 0o644)
+            os.replace(temp_file.name, os.path.join(destination, file_name))
+        except BaseException:
+            os.remove(temp_file.name)
+            raise
+        finally:
+            self.close()
+        self.save_validators()
+        return True
 
 
 class GeolocationRemoteFileArchive(GeolocationArchiveBase):
     location = settings.GEOLOCATION_MAXMIND_DATABASE_FILE_URL
+    checksum_location = settings.GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL
+    timeout = (
+        settings.GEOLOCATION_MAXMIND_CONNECT_TIMEOUT,
+        settings.GEOLOCATION_MAXMIND_READ_TIMEOUT,
+    )
+    database_location = os.path.join(
+        settings.GEOIP_PATH, settings.GEOIP_COUNTRY
+    )
+
+    def get_conditional_headers(self):
+        if not os.path.exists(self.database_location):
+            return {}
+        validators = self.read_validators()
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
 
     def retrieve_file(self):
-        file_like_object = io.BytesIO()
-        response = requests.get(self.location)
+        response = requests.get(
+            self.location,
+            headers=self.get_conditional_headers(),
+            stream=True,
+            timeout=self.timeout,
+        )
         response.raise_for_status()
-        for chunk in response.iter_content(chunk_size=1024):
-            if chunk:  # filter out keep-alive new chunks
-                file_like_object.write(chunk)
-        file_like_object.seek(0)
-        return file_like_object
+        self.response = response
+        self.is_not_modified = response.status_code == 304
+        return response.raw
+
+    def get_validators(self):
+        return {
+            'etag': self.response.headers.get('ETag'),
+            'last_modified': self.response.headers.get('Last-Modified'),
+        }
+
+    def retrieve_checksum(self):
+        if not self.checksum_location:
+            return None
+        response = requests.get(self.checksum_location, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text.split()[0].lower()
+
+    def close(self):
+        self.response.close()
 
 
 class GeolocationLocalFileArchive(GeolocationArchiveBase):
     location = os.path.join(settings.GEOIP_PATH, 'GeoLite2-Country.tar.gz')
 
     def retrieve_file(self):
-        file_like_object = io.BytesIO()
-        with open(self.location, 'rb') as f:
-            file_like_object.write(f.read())
-        file_like_object.seek(0)
-        return file_like_object
+        return open(self.location, 'rb')
 
 
 class GeolocationArchiveNegotiator:
@@ -70,7 +195,7 @@ class GeolocationArchiveNegotiator:
     def __new__(cls, *args, **kwargs):
         try:
             geolocation_archive = GeolocationRemoteFileArchive()
-        except requests.exceptions.HTTPError:
+        except requests.exceptions.RequestException:
             logger.error(cls.MESSAGE_FAILED_TO_DOWNLOAD, exc_info=True)
             geolocation_archive = GeolocationLocalFileArchive()
         return geolocation_archive
@@ -80,11 +205,27 @@ class Command(BaseCommand):
 
     help = 'Download the latest geolocation data'
 
+    MESSAGE_FAILED_TO_UPDATE = (
+        'Failed to update geolocation data. Keeping the current database.'
+    )
+
     def handle(self, *args, **options):
-        if not os.path.exists(settings.GEOIP_PATH):
-            os.makedirs(settings.GEOIP_PATH)
         geolocation_archive = GeolocationArchiveNegotiator()
-        geolocation_archive.decompress(
-            file_name=settings.GEOIP_COUNTRY,
-            destination=settings.GEOIP_PATH
-        )
+        try:
+            is_updated = geolocation_archive.decompress(
+                file_name=settings.GEOIP_COUNTRY,
+                destination=settings.GEOIP_PATH
+            )
+        except (
+            requests.exceptions.RequestException,
+            # the archive is read from the raw stream, so a connection lost
+            # mid-download raises urllib3's errors rather than requests'
+            urllib3.exceptions.HTTPError,
+            ValueError,
+            tarfile.TarError,
+        ):
+            # runs on release, so a bad download must not block the deploy
+            logger.error(self.MESSAGE_FAILED_TO_UPDATE, exc_info=True)
+            return
+        if is_updated is False:
+            self.stdout.write('Geolocation data is up to date')
@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils.module_loading import import_string
+
+from core import redirects
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Move the literal redirects in a list of url patterns to the '
+        'redirects file. Redirects already in the file are kept.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--patterns',
+            default='conf.url_redirects.redirects',
+            help='Dotted path to the list of redirect url patterns.',
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.REDIRECTS_FILE,
+            help='Path of the redirects file to write.',
+        )
+
+    def handle(self, *args, **options):
+        entries = []
+        if os.path.exists(options['output']):
+            entries = redirects.read_entries(options['output'])
+        paths = {entry['path'] for entry in entries}
+
+        exported = 0
+        kept = []
+        for pattern in import_string(options['patterns']):
+            entry = redirects.pattern_to_entry(pattern)
+            # a pattern earlier in the list that matches the path wins
+            if entry is None or any(
+                kept_pattern.regex.search(entry['path'][1:])
+                for kept_pattern in kept
+            ):
+                kept.append(pattern)
+                self.stdout.write(
+                    'Keep in the URL conf: ' + pattern.regex.pattern
+                )
+            elif entry['path'] not in paths:
+                paths.add(entry['path'])
+                entries.append(entry)
+                exported += 1
+
+        redirects.write_entries(options['output'], entries)
+        self.stdout.write('Exported {exported} redirects to {path}'.format(
+            exported=exported, path=options['output'],
+        ))
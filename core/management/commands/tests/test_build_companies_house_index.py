@@ -0,0 +1,36 @@
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core import company_index
+
+
+def test_build_companies_house_index(tmpdir, settings):
+    source = tmpdir.join('companies.csv')
+    source.write(
+        'CompanyName, CompanyNumber,RegAddress.PostCode,CompanyStatus\n'
+        'ACME LTD,00000001,EC1A 1BB,Active\n'
+    )
+    settings.COMPANIES_HOUSE_INDEX_FILE = str(tmpdir.join('companies.idx'))
+
+    call_command(
+        'build_companies_house_index', str(source),
+        output=settings.COMPANIES_HOUSE_INDEX_FILE,
+    )
+
+    index = company_index.MappedIndex(settings.COMPANIES_HOUSE_INDEX_FILE)
+    assert index.search('acme', limit=10) == [{
+        'title': 'ACME LTD',
+        'company_number': '00000001',
+        'company_status': 'Active',
+        'address': {'postal_code': 'EC1A 1BB'},
+    }]
+
+
+def test_build_companies_house_index_without_output(tmpdir):
+    with pytest.raises(CommandError):
+        call_command(
+            'build_companies_house_index', str(tmpdir.join('x.csv')),
+            output='',
+        )
@@ -1,17 +1,24 @@
+import hashlib
+import io
+import json
 import os
 import shutil
 import tarfile
-from unittest.mock import call, patch
+from unittest.mock import call, patch, Mock
 
+import requests
 import requests_mock
 import pytest
+import urllib3
 
 from django.core.management import call_command
 from django.conf import settings
 
 from core.management.commands.download_geolocation_data import (
+    Command,
     GeolocationArchiveNegotiator,
-    GeolocationLocalFileArchive
+    GeolocationLocalFileArchive,
+    GeolocationRemoteFileArchive,
 )
 
 
@@ -22,6 +29,137 @@ class GeolocationBadLocalFileArchive(GeolocationLocalFileArchive):
     )
 
 
+def create_archive(file_name, content):
+    file_like_object = io.BytesIO()
+    with tarfile.open(mode='w:gz', fileobj=file_like_object) as tar:
+        member = tarfile.TarInfo('GeoLite2-Country_20190101/' + file_name)
+        member.size = len(content)
+        tar.addfile(member, io.BytesIO(content))
+    return file_like_object.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def validators_location(tmpdir):
+    location = str(tmpdir.join('validators.json'))
+    with patch.object(
+        GeolocationLocalFileArchive, 'validators_location', location
+    ), patch.object(
+        GeolocationRemoteFileArchive, 'validators_location', location
+    ):
+        yield location
+
+
+@pytest.fixture
+def remote_archive(settings):
+    archive = create_archive(settings.GEOIP_COUNTRY, b'new database')
+    with requests_mock.mock() as mock:
+        mock.get(
+            settings.GEOLOCATION_MAXMIND_DATABASE_FILE_URL,
+            content=archive,
+            headers={
+                'ETag': '"123"',
+                'Last-Modified': 'Wed, 02 Jan 2019 00:00:00 GMT',
+            },
+        )
+        mock.get(
+            settings.GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL,
+            text=hashlib.md5(archive).hexdigest() + '  archive.tar.gz\n',
+        )
+        yield mock
+
+
+def test_remote_archive_replaces_database(
+    remote_archive, settings, tmpdir, validators_location
+):
+    destination = tmpdir.mkdir('geoip')
+    destination.join(settings.GEOIP_COUNTRY).write('old database')
+
+    is_updated = GeolocationRemoteFileArchive().decompress(
+        file_name=settings.GEOIP_COUNTRY, destination=str(destination)
+    )
+
+    assert is_updated is True
+    assert destination.listdir() == [destination.join(settings.GEOIP_COUNTRY)]
+    assert destination.join(settings.GEOIP_COUNTRY).read() == 'new database'
+    assert remote_archive.request_history[0].stream is True
+    with open(validators_location) as f:
+        assert json.load(f) == {
+            'etag': '"123"',
+            'last_modified': 'Wed, 02 Jan 2019 00:00:00 GMT',
+        }
+
+
+def test_remote_archive_checksum_mismatch(remote_archive, settings, tmpdir):
+    destination = tmpdir.mkdir('geoip')
+    destination.join(settings.GEOIP_COUNTRY).write('old database')
+    remote_archive.get(
+        settings.GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL, text='abc123'
+    )
+
+    with pytest.raises(ValueError):
+        GeolocationRemoteFileArchive().decompress(
+            file_name=settings.GEOIP_COUNTRY, destination=str(destination)
+        )
+
+    assert destination.listdir() == [destination.join(settings.GEOIP_COUNTRY)]
+    assert destination.join(settings.GEOIP_COUNTRY).read() == 'old database'
+
+
+@pytest.fixture
+def downloaded_database(tmpdir, validators_location):
+    database = tmpdir.join('database.mmdb')
+    database.write('old database')
+    with open(validators_location, 'w') as f:
+        json.dump({
+            'etag': '"123"',
+            'last_modified': 'Wed, 02 Jan 2019 00:00:00 GMT',
+        }, f)
+    with patch.object(
+        GeolocationRemoteFileArchive, 'database_location', str(database)
+    ):
+        yield database
+
+
+def test_remote_archive_not_modified(downloaded_database, settings, tmpdir):
+    with requests_mock.mock() as mock:
+        mock.get(
+            settings.GEOLOCATION_MAXMIND_DATABASE_FILE_URL, status_code=304
+        )
+        geolocation_archive = GeolocationArchiveNegotiator()
+        is_updated = geolocation_archive.decompress(
+            file_name='database.mmdb', destination=str(tmpdir)
+        )
+
+    assert is_updated is False
+    assert downloaded_database.read() == 'old database'
+    assert len(mock.request_history) == 1
+    headers = mock.request_history[0].headers
+    assert headers['If-None-Match'] == '"123"'
+    assert headers['If-Modified-Since'] == 'Wed, 02 Jan 2019 00:00:00 GMT'
+
+
+def test_remote_archive_unconditional_without_database(
+    downloaded_database, remote_archive
+):
+    downloaded_database.remove()
+
+    GeolocationRemoteFileArchive()
+
+    headers = remote_archive.request_history[0].headers
+    assert 'If-None-Match' not in headers
+    assert 'If-Modified-Since' not in headers
+
+
+def test_local_archive_removes_validators(
+    downloaded_database, settings, tmpdir, validators_location
+):
+    GeolocationLocalFileArchive().decompress(
+        file_name=settings.GEOIP_COUNTRY, destination=str(tmpdir)
+    )
+
+    assert os.path.exists(validators_location) is False
+
+
 def test_falls_back_to_local_file_on_http_error(settings, caplog):
     with requests_mock.mock() as mock:
         mock.get(
@@ -37,6 +175,21 @@ def test_falls_back_to_local_file_on_http_error(settings, caplog):
     assert log.msg == GeolocationArchiveNegotiator.MESSAGE_FAILED_TO_DOWNLOAD
 
 
+def test_falls_back_to_local_file_on_connection_error(settings, caplog):
+    with requests_mock.mock() as mock:
+        mock.get(
+            settings.GEOLOCATION_MAXMIND_DATABASE_FILE_URL,
+            exc=requests.exceptions.ConnectionError,
+        )
+        geolocation_archive = GeolocationArchiveNegotiator()
+
+    assert isinstance(geolocation_archive, GeolocationLocalFileArchive)
+
+    log = caplog.records[0]
+    assert log.levelname == 'ERROR'
+    assert log.msg == GeolocationArchiveNegotiator.MESSAGE_FAILED_TO_DOWNLOAD
+
+
 def test_handles_remote_invalid_archive(settings):
     with requests_mock.mock() as mock:
         mock.get(
@@ -93,3 +246,73 @@ def test_call_command(mock_geolocation_navigator, settings):
        file_name=settings.GEOIP_COUNTRY,
        destination=settings.GEOIP_PATH,
     )
+
+
+@patch(
+    'core.management.commands.download_geolocation_data.'
+    'GeolocationArchiveNegotiator'
+)
+def test_call_command_not_modified(mock_geolocation_navigator):
+    mock_geolocation_navigator().decompress.return_value = False
+    stdout = Mock()
+
+    call_command('download_geolocation_data', stdout=stdout)
+
+    assert stdout.write.call_args == call('Geolocation data is up to date\n')
+
+
+@pytest.mark.parametrize('checksum_response', (
+    {'text': 'abc123'},
+    {'status_code': 500},
+    {'exc': requests.exceptions.ConnectionError},
+))
+def test_call_command_keeps_database_on_failure(
+    remote_archive, settings, tmpdir, caplog, checksum_response
+):
+    destination = tmpdir.mkdir('geoip')
+    destination.join(settings.GEOIP_COUNTRY).write('old database')
+    settings.GEOIP_PATH = str(destination)
+    remote_archive.get(
+        settings.GEOLOCATION_MAXMIND_DATABASE_CHECKSUM_URL,
+        **checksum_response
+    )
+
+    call_command('download_geolocation_data')
+
+    assert destination.listdir() == [destination.join(settings.GEOIP_COUNTRY)]
+    assert destination.join(settings.GEOIP_COUNTRY).read() == 'old database'
+    assert Command.MESSAGE_FAILED_TO_UPDATE in [
+        record.msg for record in caplog.records
+    ]
+
+
+@pytest.mark.parametrize('error', (
+    urllib3.exceptions.ProtocolError('Connection broken'),
+    urllib3.exceptions.ReadTimeoutError(None, None, 'Read timed out'),
+))
+def test_call_command_keeps_database_on_dropped_connection(
+    settings, tmpdir, caplog, error
+):
+    destination = tmpdir.mkdir('geoip')
+    destination.join(settings.GEOIP_COUNTRY).write('old database')
+    settings.GEOIP_PATH = str(destination)
+    stream = Mock(read=Mock(side_effect=[b'\x1f\x8b', error]))
+
+    with requests_mock.mock() as mock:
+        mock.get(
+            settings.GEOLOCATION_MAXMIND_DATABASE_FILE_URL,
+            raw=urllib3.HTTPResponse(
+                body=stream, status=200, preload_content=False
+            ),
+        )
+        call_command('download_geolocation_data')
+
+    assert mock.request_history[0].timeout == (
+        settings.GEOLOCATION_MAXMIND_CONNECT_TIMEOUT,
+        settings.GEOLOCATION_MAXMIND_READ_TIMEOUT,
+    )
+    assert destination.listdir() == [destination.join(settings.GEOIP_COUNTRY)]
+    assert destination.join(settings.GEOIP_COUNTRY).read() == 'old database'
+    assert Command.MESSAGE_FAILED_TO_UPDATE in [
+        record.msg for record in caplog.records
+    ]
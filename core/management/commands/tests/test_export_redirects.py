@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.conf.urls import url
+from django.core.management import call_command
+
+from core import redirects
+from core.views import QuerystringRedirectView
+
+
+patterns = [
+    url(r'^a/$', QuerystringRedirectView.as_view(url='/to-a/')),
+    url(r'^b/(.*/)?$', QuerystringRedirectView.as_view(url='/to-b/')),
+    url(r'^b/c/$', QuerystringRedirectView.as_view(url='/to-c/')),
+    url(r'^existing/$', QuerystringRedirectView.as_view(url='/new/')),
+]
+
+
+def test_export_redirects(tmpdir):
+    output = str(tmpdir.join('redirects.json'))
+    redirects.write_entries(output, [{'path': '/existing/', 'url': '/old/'}])
+    stdout = mock.Mock()
+
+    call_command(
+        'export_redirects',
+        patterns=__name__ + '.patterns',
+        output=output,
+        stdout=stdout,
+    )
+
+    assert redirects.read_entries(output) == [
+        {'path': '/existing/', 'url': '/old/'},
+        {'path': '/a/', 'url': '/to-a/'},
+    ]
+    assert stdout.write.call_args_list == [
+        mock.call('Keep in the URL conf: ^b/(.*/)?$\n'),
+        mock.call('Keep in the URL conf: ^b/c/$\n'),
+        mock.call('Exported 1 redirects to {}\n'.format(output)),
+    ]
@@ -0,0 +1,139 @@
+from unittest import mock
+
+from directory_cms_client.client import cms_api_client
+from directory_cms_client.helpers import (
+    handle_cms_response, handle_cms_response_allow_404
+)
+from directory_constants.constants import cms
+
+from django.core.management import call_command
+
+from conf import urls
+from core import cache
+from core.management.commands import warm_cms_cache
+from core.tests.helpers import create_response
+
+
+def test_get_cms_lookups():
+    lookups = warm_cms_cache.get_cms_lookups(urls.urlpatterns, ['en-gb', 'de'])
+
+    assert (
+        handle_cms_response_allow_404, {'slug': cms.GREAT_HOME_SLUG}
+    ) in lookups
+    # cms.* constant on the view
+    assert (handle_cms_response, {
+        'slug': cms.GREAT_TERMS_AND_CONDITIONS_SLUG, 'language_code': 'de',
+    }) in lookups
+    # slug fixed by the article routes
+    assert (handle_cms_response, {
+        'slug': 'create-an-export-plan', 'language_code': 'en-gb',
+    }) in lookups
+    assert (handle_cms_response_allow_404, {
+        'slug': cms.COMPONENTS_BANNER_INTERNATIONAL_SLUG,
+        'language_code': 'de',
+        'service_name': cms.COMPONENTS,
+    }) in lookups
+    # slugs taken from the request path are not known ahead of time
+    assert all(isinstance(kwargs['slug'], str) for _, kwargs in lookups)
+    assert len(lookups) == len({
+        tuple(sorted(kwargs.items())) for _, kwargs in lookups
+    })
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_warm_cms_cache(mock_lookup_by_slug, settings):
+    settings.LANGUAGES = [('en-gb', 'English')]
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page'}
+    )
+    stdout = mock.Mock()
+
+    call_command('warm_cms_cache', stdout=stdout)
+
+    key = cache.CMSPageCache.build_key(
+        'lookup_by_slug',
+        slug=cms.GREAT_TERMS_AND_CONDITIONS_SLUG,
+        language_code='en-gb',
+    )
+    entry = cache.cms_page_cache.shared_cache.get(key)
+    assert entry['page'] == {'title': 'the page'}
+    assert mock.call(
+        slug=cms.GREAT_TERMS_AND_CONDITIONS_SLUG,
+        language_code='en-gb',
+        draft_token=None,
+    ) in mock_lookup_by_slug.call_args_list
+    total = mock_lookup_by_slug.call_count
+    assert stdout.write.call_args == mock.call(
+        'Warmed {total} of {total} CMS pages, 0 already fresh\n'.format(
+            total=total
+        )
+    )
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_warm_cms_cache_continues_on_failure(mock_lookup_by_slug, settings):
+    settings.LANGUAGES = [('en-gb', 'English')]
+    mock_lookup_by_slug.return_value = create_response(status_code=500)
+    stdout = mock.Mock()
+
+    call_command('warm_cms_cache', stdout=stdout)
+
+    total = mock_lookup_by_slug.call_count
+    assert total > 1
+    assert stdout.write.call_args == mock.call(
+        'Warmed 0 of {total} CMS pages, 0 already fresh\n'.format(
+            total=total
+        )
+    )
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_warm_cms_cache_skips_fresh_pages(mock_lookup_by_slug, settings):
+    settings.LANGUAGES = [('en-gb', 'English')]
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page'}
+    )
+    call_command('warm_cms_cache', stdout=mock.Mock())
+    total = mock_lookup_by_slug.call_count
+    stdout = mock.Mock()
+
+    call_command('warm_cms_cache', stdout=stdout)
+
+    assert mock_lookup_by_slug.call_count == total
+    assert stdout.write.call_args == mock.call(
+        'Warmed 0 of {total} CMS pages, {total} already fresh\n'.format(
+            total=total
+        )
+    )
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_warm_cms_cache_deadline(mock_lookup_by_slug, settings, caplog):
+    settings.LANGUAGES = [('en-gb', 'English')]
+    stdout = mock.Mock()
+
+    call_command('warm_cms_cache', deadline=0, stdout=stdout)
+
+    assert mock_lookup_by_slug.call_count == 0
+    assert warm_cms_cache.Command.MESSAGE_DEADLINE_PASSED in [
+        record.msg for record in caplog.records
+    ]
+    assert stdout.write.call_args[0][0].startswith('Warmed 0 of ')
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_warm_cms_cache_timeout(mock_lookup_by_slug, settings):
+    settings.LANGUAGES = [('en-gb', 'English')]
+    default_timeout = cms_api_client.timeout
+    timeouts = set()
+
+    def lookup_by_slug(**kwargs):
+        timeouts.add(cms_api_client.timeout)
+        return create_response(status_code=200, json_body={})
+
+    mock_lookup_by_slug.side_effect = lookup_by_slug
+
+    call_command('warm_cms_cache', timeout=1.5, stdout=mock.Mock())
+
+    assert timeouts == {1.5}
+    assert cms_api_client.timeout == default_timeout
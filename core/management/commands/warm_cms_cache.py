@@ -0,0 +1,153 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from directory_cms_client.client import cms_api_client
+from directory_cms_client.helpers import (
+    handle_cms_response, handle_cms_response_allow_404
+)
+from directory_constants.constants import cms
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.urls import RegexURLResolver
+
+from core import cache, mixins
+
+
+logger = logging.getLogger(__name__)
+
+
+def iterate_url_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, RegexURLResolver):
+            yield from iterate_url_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def get_static_slug(pattern, view_class, attribute):
+    if attribute == 'slug' and 'slug' in pattern.default_args:
+        return pattern.default_args['slug']
+    value = getattr(view_class, attribute, None)
+    if isinstance(value, str):
+        return value
+
+
+def get_cms_lookups(patterns, language_codes):
+    """Lists the CMS lookups that the views in `patterns` make on a cold
+    cache, for every language in `language_codes`.
+
+    Only lookups with a slug known ahead of time (a `cms.*` constant on the
+    view, or a slug fixed by the URL conf such as the article routes) are
+    included.
+
+    """
+
+    lookups = {
+        (handle_cms_response_allow_404, (('slug', cms.GREAT_HOME_SLUG),)),
+    }
+    for pattern in iterate_url_patterns(patterns):
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None:
+            continue
+        if issubclass(view_class, mixins.GetCMSPageMixin):
+            slug = get_static_slug(pattern, view_class, 'slug')
+            if slug:
+                for language_code in language_codes:
+                    lookups.add((handle_cms_response, (
+                        ('slug', slug), ('language_code', language_code),
+                    )))
+        if issubclass(view_class, mixins.GetCMSComponentMixin):
+            slug = get_static_slug(pattern, view_class, 'component_slug')
+            if slug:
+                for language_code in language_codes:
+                    lookups.add((handle_cms_response_allow_404, (
+                        ('slug', slug),
+                        ('language_code', language_code),
+                        ('service_name', cms.COMPONENTS),
+                    )))
+    return [(handler, dict(kwargs)) for handler, kwargs in sorted(
+        lookups, key=lambda lookup: lookup[1]
+    )]
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Populate the shared cache with the CMS pages that views look up by '
+        'a known slug, in every language'
+    )
+
+    MESSAGE_WARM_FAILED = 'Failed to warm cached CMS page'
+    MESSAGE_DEADLINE_PASSED = (
+        'Stopped warming CMS pages, the deadline has passed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of CMS lookups to run in parallel.',
+        )
+        parser.add_argument(
+            '--deadline',
+            type=float,
+            default=settings.CMS_WARM_CACHE_DEADLINE_SECONDS,
+            help='Seconds after which no more CMS lookups are started.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=settings.CMS_WARM_CACHE_TIMEOUT,
+            help='Timeout in seconds of each CMS lookup.',
+        )
+
+    def warm(self, handler, kwargs, deadline):
+        if time.monotonic() >= deadline:
+            return 'skipped'
+        try:
+            is_fetched = cache.cms_page_cache.warm(
+                'lookup_by_slug', handler=handler, **kwargs
+            )
+        except Exception:
+            logger.warning(
+                self.MESSAGE_WARM_FAILED, extra=kwargs, exc_info=True
+            )
+            return 'failed'
+        return 'warmed' if is_fetched else 'fresh'
+
+    def handle(self, *args, **options):
+        from conf import urls
+
+        language_codes = [code for code, _ in settings.LANGUAGES]
+        lookups = get_cms_lookups(urls.urlpatterns, language_codes)
+        deadline = time.monotonic() + options['deadline']
+        default_timeout = cms_api_client.timeout
+        # the command runs in its own process, before gunicorn starts
+        cms_api_client.timeout = options['timeout']
+        try:
+            with ThreadPoolExecutor(
+                max_workers=options['workers']
+            ) as executor:
+                results = collections.Counter(executor.map(
+                    lambda lookup: self.warm(*lookup, deadline=deadline),
+                    lookups
+                ))
+        finally:
+            cms_api_client.timeout = default_timeout
+        if results['skipped']:
+            logger.warning(
+                self.MESSAGE_DEADLINE_PASSED,
+                extra={'skipped': results['skipped']},
+            )
+        self.stdout.write(
+            'Warmed {warmed} of {total} CMS pages, {fresh} already fresh'
+            .format(
+                warmed=results['warmed'],
+                fresh=results['fresh'],
+                total=len(lookups),
+            )
+        )
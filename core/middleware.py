@@ -1,7 +1,10 @@
 from django.conf import settings
+from django.http import HttpResponsePermanentRedirect
 from django.middleware.locale import LocaleMiddleware
 from django.utils import translation
 
+from core import redirects
+
 
 class LocaleQuerystringMiddleware(LocaleMiddleware):
 
@@ -52,3 +55,26 @@ class ForceDefaultLocale:
     def process_exception(self, request, exception):
         if hasattr(request, 'LANGUAGE_CODE') and request.LANGUAGE_CODE:
             translation.activate(request.LANGUAGE_CODE)
+
+
+class RedirectTableMiddleware:
+    """
+    Serve the redirects in the redirects file from a hash map before the URL
+    resolver is reached. Paths missing only the trailing slash are sent to
+    the slashed path, as CommonMiddleware would do for a resolvable url.
+
+    """
+
+    def process_request(self, request):
+        redirect_table = redirects.redirect_store.get()
+        path = request.path_info
+        response = redirect_table.get_response(request, path)
+        if response is not None:
+            return response
+        if (
+            settings.APPEND_SLASH and not path.endswith('/') and
+            redirect_table.lookup(path + '/') is not None
+        ):
+            return HttpResponsePermanentRedirect(
+                request.get_full_path(force_append_slash=True)
+            )
@@ -1,4 +1,5 @@
-from directory_cms_client.client import cms_api_client
+from concurrent.futures import ThreadPoolExecutor
+
 from directory_constants.constants import cms
 from django.http import Http404
 from django.conf import settings
@@ -9,7 +10,8 @@ from directory_cms_client.helpers import (
 from django.utils import translation
 from django.utils.functional import cached_property
 
-from core import helpers
+from core import cache, helpers
+from sso import utils as sso_utils
 
 
 class NotFoundOnDisabledFeature:
@@ -58,12 +60,12 @@ class MarketAccessFeatureFlagMixin(NotFoundOnDisabledFeature):
 class GetCMSPageMixin:
     @cached_property
     def page(self):
-        response = cms_api_client.lookup_by_slug(
+        return cache.lookup_by_slug(
+            handler=handle_cms_response,
             slug=self.slug,
             language_code=translation.get_language(),
             draft_token=self.request.GET.get('draft_token'),
         )
-        return handle_cms_response(response)
 
     def get_context_data(self, *args, **kwargs):
         return super().get_context_data(page=self.page, *args, **kwargs)
@@ -72,13 +74,13 @@ class GetCMSPageMixin:
 class GetCMSComponentMixin:
     @cached_property
     def cms_component(self):
-        response = cms_api_client.lookup_by_slug(
+        return cache.lookup_by_slug(
+            handler=handle_cms_response_allow_404,
             slug=self.component_slug,
             language_code=translation.get_language(),
             draft_token=self.request.GET.get('draft_token'),
             service_name=cms.COMPONENTS,
         )
-        return handle_cms_response_allow_404(response)
 
     @property
     def component_is_bidi(self):
@@ -97,6 +99,39 @@ class GetCMSComponentMixin:
         )
 
 
+cms_prefetch_executor = ThreadPoolExecutor(
+    max_workers=settings.CMS_PREFETCH_WORKERS
+)
+
+
+class PrefetchCMSMixin:
+    """Resolves the CMS lookups named in `prefetch_cms_attributes`
+    concurrently before rendering, so the view waits for the slowest lookup
+    rather than the sum of them.
+
+    """
+
+    prefetch_cms_attributes = ('page', 'cms_component')
+
+    def get(self, request, *args, **kwargs):
+        self.prefetch_cms()
+        return super().get(request, *args, **kwargs)
+
+    def prefetch_cms(self):
+        language_code = translation.get_language()
+
+        def resolve(name):
+            with translation.override(language_code):
+                return getattr(self, name)
+
+        futures = [
+            cms_prefetch_executor.submit(resolve, name)
+            for name in self.prefetch_cms_attributes
+        ]
+        for future in futures:
+            future.result()
+
+
 class TranslationsMixin:
 
     def dispatch(self, request, *args, **kwargs):
@@ -139,7 +174,7 @@ class PrepopulateFormMixin:
 
     @cached_property
     def company_profile(self):
-        return helpers.get_company_profile(self.request)
+        return sso_utils.get_company_profile(self.request)
 
     def get_form_kwargs(self):
         form_kwargs = super().get_form_kwargs()
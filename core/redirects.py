@@ -0,0 +1,156 @@
+import json
+import logging
+import re
+import signal
+
+from django.conf import settings
+from django.views.generic.base import RedirectView
+
+from core.cache import ReloadableFile
+from core.views import QuerystringRedirectView, TranslationRedirectView
+
+
+logger = logging.getLogger(__name__)
+
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+REDIRECT_VIEWS = {
+    'querystring': QuerystringRedirectView,
+    'translation': TranslationRedirectView,
+    'redirect': RedirectView,
+}
+DEFAULT_VIEW_NAME = 'querystring'
+
+
+def get_literal_path(pattern):
+    """Returns the path a url pattern matches if it matches exactly one path,
+    otherwise None.
+
+    """
+
+    regex = pattern.regex.pattern.replace('(?i)', '')
+    if not (regex.startswith('^') and regex.endswith('$')):
+        return None
+    body = regex[1:-1]
+    if REGEX_METACHARACTERS.intersection(body):
+        return None
+    return '/' + body
+
+
+def pattern_to_entry(pattern):
+    """Converts a literal redirect url pattern to a redirects file entry.
+
+    Lazy urls such as `reverse_lazy(...)` are resolved, so this must be
+    called once the URL conf can be loaded.
+
+    """
+
+    path = get_literal_path(pattern)
+    view_class = getattr(pattern.callback, 'view_class', None)
+    view_names = {view: name for name, view in REDIRECT_VIEWS.items()}
+    if path is None or view_class not in view_names or pattern.default_args:
+        return None
+    entry = {'path': path}
+    if view_class is not REDIRECT_VIEWS[DEFAULT_VIEW_NAME]:
+        entry['view'] = view_names[view_class]
+    if pattern.regex.flags & re.IGNORECASE:
+        entry['case_insensitive'] = True
+    for key, value in sorted(pattern.callback.view_initkwargs.items()):
+        entry[key] = value if isinstance(value, (bool, int)) else str(value)
+    return entry
+
+
+def build_view(entry):
+    entry = dict(entry)
+    entry.pop('path')
+    entry.pop('case_insensitive', None)
+    view_class = REDIRECT_VIEWS[entry.pop('view', DEFAULT_VIEW_NAME)]
+    return view_class.as_view(**entry)
+
+
+def read_entries(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_entries(path, entries):
+    """Writes one entry per line, to keep the file compact and its diffs
+    readable.
+
+    """
+
+    lines = ',\n'.join('  ' + json.dumps(entry) for entry in entries)
+    with open(path, 'w') as f:
+        f.write('[\n' + lines + '\n]\n')
+
+
+class RedirectTable:
+    """Hash map of redirect views keyed on the path they redirect from.
+
+    Entries flagged `case_insensitive` are indexed on their lowercased path,
+    which is checked after an exact match.
+
+    """
+
+    def __init__(self, entries=()):
+        self.exact = {}
+        self.case_insensitive = {}
+        for entry in entries:
+            view = build_view(entry)
+            if entry.get('case_insensitive'):
+                self.case_insensitive[entry['path'].lower()] = view
+            else:
+                self.exact[entry['path']] = view
+
+    def __len__(self):
+        return len(self.exact) + len(self.case_insensitive)
+
+    def lookup(self, path):
+        view = self.exact.get(path)
+        if view is None:
+            view = self.case_insensitive.get(path.lower())
+        return view
+
+    def get_response(self, request, path):
+        view = self.lookup(path)
+        if view is not None:
+            return view(request)
+
+
+class RedirectStore(ReloadableFile):
+    """Keeps a RedirectTable in sync with the redirects file.
+
+    The table is rebuilt when the file changes or when a reload has been
+    requested, for example on SIGHUP. If the file cannot be loaded the
+    previous table is kept.
+
+    """
+
+    MESSAGE_LOAD_FAILED = 'Failed to load redirects file'
+
+    def reset(self):
+        super().reset()
+        self.value = RedirectTable()
+
+    def load(self):
+        try:
+            return RedirectTable(read_entries(self.path))
+        except Exception:
+            logger.error(
+                self.MESSAGE_LOAD_FAILED,
+                extra={'path': self.path},
+                exc_info=True,
+            )
+            return self.value
+
+
+redirect_store = RedirectStore(
+    path=settings.REDIRECTS_FILE,
+    check_interval=settings.REDIRECTS_RELOAD_CHECK_SECONDS,
+)
+
+
+def install_reload_signal_handler():
+    """Reloads the redirects file when the process receives SIGHUP."""
+
+    signal.signal(signal.SIGHUP, redirect_store.request_reload)
@@ -1,3 +1,5 @@
+import re
+
 import requests
 
 
@@ -7,3 +9,26 @@ def create_response(status_code, json_body={}, content=None):
     response.json = lambda: json_body
     response._content = content
     return response
+
+
+def legacy_sanitise_query(text):
+    """ The original core.helpers.sanitise_query, kept to check that the
+        precompiled version returns identical output.
+    """
+    text = re.sub('([{}])'.format(
+        re.escape(r'\\+\-&|!(){}\[\]^~*?:\/')
+    ), r"\\\1", text)
+
+    for word in ['AND', 'OR', 'NOT']:
+        escaped_word = "".join(["\\" + letter for letter in word])
+        text = re.sub(
+            r'\s*\b({})\b\s*'.format(word),
+            r" {} ".format(escaped_word),
+            text
+        )
+
+    quote_count = text.count('"')
+    if quote_count % 2 == 1:
+        return re.sub(r'(.*)"(.*)', r'\1\"\2', text)
+    else:
+        return text
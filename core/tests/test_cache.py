@@ -0,0 +1,355 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from directory_cms_client.helpers import handle_cms_response
+from django.http import Http404
+
+from core import cache
+from core.tests.helpers import create_response
+
+
+@pytest.fixture
+def local_cache():
+    return cache.LocalLRUCache(max_size=2, timeout=10)
+
+
+def test_local_lru_cache_get_set(local_cache):
+    local_cache.set('a', 1)
+
+    assert local_cache.get('a') == 1
+    assert local_cache.get('b') is None
+
+
+def test_local_lru_cache_evicts_least_recently_used(local_cache):
+    local_cache.set('a', 1)
+    local_cache.set('b', 2)
+    local_cache.get('a')
+    local_cache.set('c', 3)
+
+    assert len(local_cache) == 2
+    assert local_cache.get('a') == 1
+    assert local_cache.get('b') is None
+    assert local_cache.get('c') == 3
+
+
+@mock.patch('time.monotonic')
+def test_local_lru_cache_expires(mock_monotonic, local_cache):
+    mock_monotonic.return_value = 100
+    local_cache.set('a', 1)
+
+    mock_monotonic.return_value = 109
+    assert local_cache.get('a') == 1
+
+    mock_monotonic.return_value = 110
+    assert local_cache.get('a') is None
+    assert len(local_cache) == 0
+
+
+@pytest.fixture
+def reloadable_file(tmpdir):
+    path = tmpdir.join('data.txt')
+    path.write('v1')
+    reloadable_file = cache.ReloadableFile(path=str(path), check_interval=5)
+    reloadable_file.load = mock.Mock()
+    return reloadable_file
+
+
+@mock.patch('time.monotonic', mock.Mock(return_value=100))
+def test_reloadable_file_retries_failed_load(reloadable_file):
+    reloadable_file.load.side_effect = [OSError(), 'v1']
+
+    with pytest.raises(OSError):
+        reloadable_file.get()
+
+    assert reloadable_file.get() == 'v1'
+    assert reloadable_file.get() == 'v1'
+    assert reloadable_file.load.call_count == 2
+
+
+@mock.patch('time.monotonic', mock.Mock(return_value=100))
+def test_reloadable_file_serves_loaded_value_during_reload(reloadable_file):
+    reloadable_file.load.return_value = 'v1'
+    reloadable_file.get()
+    reloadable_file.request_reload()
+
+    # another thread is reloading the file
+    with reloadable_file.lock:
+        assert reloadable_file.get() == 'v1'
+
+    assert reloadable_file.load.call_count == 1
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_read_through(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page'}
+    )
+
+    for _ in range(3):
+        page = cache.lookup_by_slug(
+            handler=handle_cms_response, slug='the-slug', language_code='de',
+        )
+
+    assert page == {'title': 'the page'}
+    assert mock_lookup_by_slug.call_count == 1
+    assert mock_lookup_by_slug.call_args == mock.call(
+        slug='the-slug', language_code='de', draft_token=None,
+    )
+    assert cache.cms_page_cache.stats == {
+        'local': {'hits': 2, 'misses': 1},
+        'shared': {'hits': 0, 'misses': 1},
+    }
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_returns_copies(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page', 'tags': []}
+    )
+
+    for _ in range(2):
+        page = cache.lookup_by_slug(
+            handler=handle_cms_response, slug='the-slug',
+        )
+        assert page == {'title': 'the page', 'tags': []}
+        page['tags'].append('changed')
+
+    assert mock_lookup_by_slug.call_count == 1
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_shared_tier(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page'}
+    )
+    cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+    cache.cms_page_cache.local_cache.clear()
+
+    page = cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+    assert page == {'title': 'the page'}
+    assert mock_lookup_by_slug.call_count == 1
+    assert cache.cms_page_cache.stats['shared'] == {'hits': 1, 'misses': 1}
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_keyed_on_language_and_service(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={}
+    )
+
+    cache.lookup_by_slug(
+        handler=handle_cms_response, slug='the-slug', language_code='de'
+    )
+    cache.lookup_by_slug(
+        handler=handle_cms_response, slug='the-slug', language_code='ja'
+    )
+    cache.lookup_by_slug(
+        handler=handle_cms_response, slug='the-slug', language_code='ja',
+        service_name='COMPONENTS',
+    )
+
+    assert mock_lookup_by_slug.call_count == 3
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_bypassed_for_draft_token(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={}
+    )
+
+    for _ in range(2):
+        cache.lookup_by_slug(
+            handler=handle_cms_response, slug='the-slug', draft_token='123',
+        )
+
+    assert mock_lookup_by_slug.call_count == 2
+    assert cache.cms_page_cache.stats['local'] == {'hits': 0, 'misses': 0}
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_does_not_cache_errors(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(status_code=404)
+
+    for _ in range(2):
+        with pytest.raises(Http404):
+            cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+    assert mock_lookup_by_slug.call_count == 2
+
+
+@pytest.fixture
+def inline_executor():
+    executor = mock.Mock(
+        submit=lambda func, *args, **kwargs: func(*args, **kwargs)
+    )
+    with mock.patch.object(cache.cms_page_cache, 'executor', executor):
+        yield executor
+
+
+@pytest.fixture
+def stale_page(settings):
+    settings.CMS_PAGE_CACHE_EXPIRE_SECONDS = 10
+    with mock.patch('time.time', return_value=100):
+        cache.cms_page_cache.set(
+            cache.CMSPageCache.build_key('lookup_by_slug', slug='the-slug'),
+            {'title': 'stale'},
+        )
+    with mock.patch('time.time', return_value=111):
+        yield
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_serves_stale_and_refreshes(
+    mock_lookup_by_slug, inline_executor, stale_page
+):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'fresh'}
+    )
+
+    page = cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+    assert page == {'title': 'stale'}
+    assert mock_lookup_by_slug.call_count == 1
+    assert cache.lookup_by_slug(
+        handler=handle_cms_response, slug='the-slug'
+    ) == {'title': 'fresh'}
+    assert mock_lookup_by_slug.call_count == 1
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_refresh_locked(
+    mock_lookup_by_slug, stale_page, inline_executor
+):
+    key = cache.CMSPageCache.build_key('lookup_by_slug', slug='the-slug')
+    cache.cms_page_cache.shared_cache.add('lock:' + key, True)
+
+    page = cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+    assert page == {'title': 'stale'}
+    assert mock_lookup_by_slug.call_count == 0
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_refresh_failure_keeps_stale(
+    mock_lookup_by_slug, stale_page, inline_executor
+):
+    mock_lookup_by_slug.return_value = create_response(status_code=500)
+
+    for _ in range(2):
+        page = cache.lookup_by_slug(
+            handler=handle_cms_response, slug='the-slug'
+        )
+
+    assert page == {'title': 'stale'}
+    assert mock_lookup_by_slug.call_count == 2
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_refresh_not_found_evicts(
+    mock_lookup_by_slug, stale_page, inline_executor
+):
+    mock_lookup_by_slug.return_value = create_response(status_code=404)
+
+    cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+    with pytest.raises(Http404):
+        cache.lookup_by_slug(handler=handle_cms_response, slug='the-slug')
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_tag')
+def test_cms_page_cache_lookup_by_tag(mock_lookup_by_tag):
+    mock_lookup_by_tag.return_value = create_response(
+        status_code=200, json_body={'name': 'the tag'}
+    )
+
+    for _ in range(2):
+        page = cache.lookup_by_tag(
+            handler=handle_cms_response, slug='the-tag'
+        )
+
+    assert page == {'name': 'the tag'}
+    assert mock_lookup_by_tag.call_count == 1
+    assert mock_lookup_by_tag.call_args == mock.call(
+        slug='the-tag', draft_token=None
+    )
+
+
+def test_single_flight_leader_runs_call():
+    single_flight = cache.SingleFlight()
+    func = mock.Mock(return_value={'title': 'x'})
+
+    assert single_flight.do('key', func, 1, b=2) == {'title': 'x'}
+    assert func.call_args == mock.call(1, b=2)
+    assert single_flight.calls == {}
+
+
+def test_single_flight_shares_in_flight_call():
+    single_flight = cache.SingleFlight()
+    future = Future()
+    single_flight.calls['key'] = future
+    func = mock.Mock()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        follower = executor.submit(single_flight.do, 'key', func)
+        future.set_result({'title': 'x'})
+
+    assert follower.result() == {'title': 'x'}
+    assert func.call_count == 0
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = cache.SingleFlight()
+    future = Future()
+    single_flight.calls['key'] = future
+    future.set_exception(Http404())
+
+    with pytest.raises(Http404):
+        single_flight.do('key', mock.Mock())
+
+
+@mock.patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_page_cache_coalesces_draft_lookups(mock_lookup_by_slug):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'draft'}
+    )
+    in_flight_key = (
+        'lookup_by_slug',
+        handle_cms_response,
+        frozenset({'slug': 'the-slug', 'draft_token': '123'}.items()),
+    )
+    future = Future()
+    future.set_result({'title': 'shared'})
+    cache.cms_page_cache.in_flight.calls[in_flight_key] = future
+
+    page = cache.lookup_by_slug(
+        handler=handle_cms_response, slug='the-slug', draft_token='123',
+    )
+
+    del cache.cms_page_cache.in_flight.calls[in_flight_key]
+    assert page == {'title': 'shared'}
+    assert mock_lookup_by_slug.call_count == 0
+
+
+def test_cms_page_cache_returns_copies_of_shared_draft():
+    in_flight_key = (
+        'lookup_by_slug',
+        handle_cms_response,
+        frozenset({'slug': 'the-slug', 'draft_token': '123'}.items()),
+    )
+    future = Future()
+    future.set_result({'title': 'shared', 'tags': []})
+    cache.cms_page_cache.in_flight.calls[in_flight_key] = future
+
+    pages = [
+        cache.lookup_by_slug(
+            handler=handle_cms_response, slug='the-slug', draft_token='123',
+        )
+        for _ in range(2)
+    ]
+    pages[0]['tags'].append('changed')
+
+    del cache.cms_page_cache.in_flight.calls[in_flight_key]
+    assert pages[1] == {'title': 'shared', 'tags': []}
@@ -0,0 +1,193 @@
+import os
+import zipfile
+from unittest import mock
+
+import pytest
+
+from core import company_index
+
+
+BULK_CSV = (
+    'CompanyName, CompanyNumber,RegAddress.PostCode,CompanyStatus\n'
+    '"ACME  WIDGETS LTD",00000002,SW1A 1AA,Active\n'
+    'ACME LTD,00000001,EC1A 1BB,Active\n'
+    'Zebra Plc,00000003,,Liquidation\n'
+    '"",00000004,,Active\n'
+)
+
+
+def create_company(title, company_number, postal_code='SW1A 1AA'):
+    return {
+        'title': title,
+        'company_number': company_number,
+        'company_status': 'Active',
+        'postal_code': postal_code,
+    }
+
+
+def create_item(title, company_number, postal_code='SW1A 1AA'):
+    return {
+        'title': title,
+        'company_number': company_number,
+        'company_status': 'Active',
+        'address': {'postal_code': postal_code},
+    }
+
+
+@pytest.fixture
+def index_path(tmpdir):
+    path = str(tmpdir.join('companies.idx'))
+    company_index.write_index(path, [
+        create_company('Acme Widgets Ltd', '2'),
+        create_company('ACME LTD', '1'),
+        create_company('Acme Ltd', '0'),
+        create_company('Zebra PLC', '3'),
+    ])
+    return path
+
+
+def test_read_bulk_companies_csv(tmpdir):
+    path = tmpdir.join('companies.csv')
+    path.write(BULK_CSV)
+
+    companies = list(company_index.read_bulk_companies(str(path)))
+
+    assert companies[0] == {
+        'title': 'ACME WIDGETS LTD',
+        'company_number': '00000002',
+        'company_status': 'Active',
+        'postal_code': 'SW1A 1AA',
+    }
+    assert len(companies) == 4
+
+
+def test_read_bulk_companies_zip(tmpdir):
+    path = str(tmpdir.join('companies.zip'))
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('BasicCompanyData-part1.csv', BULK_CSV)
+
+    companies = list(company_index.read_bulk_companies(path))
+
+    assert [company['company_number'] for company in companies] == [
+        '00000002', '00000001', '00000003', '00000004'
+    ]
+
+
+def test_write_index_skips_blank_names(tmpdir):
+    path = str(tmpdir.join('companies.idx'))
+
+    count = company_index.write_index(path, [
+        create_company('', '1'), create_company('Acme', '2'),
+    ])
+
+    assert count == 1
+    assert len(company_index.MappedIndex(path)) == 1
+
+
+def test_write_index_merges_sorted_runs(tmpdir):
+    path = str(tmpdir.join('companies.idx'))
+    companies = [
+        create_company(title, str(number)) for number, title in enumerate([
+            'Zebra Ltd', 'Acme Ltd', 'Yak Ltd', 'ACME LTD', 'Beta\rLtd',
+            'Acme Widgets Ltd', 'Beta\u2028Ltd',
+        ])
+    ]
+
+    company_index.write_index(path, companies, run_size=2)
+    index = company_index.MappedIndex(path)
+
+    assert [index.get_item(position) for position in range(len(index))] == [
+        create_item('Acme Ltd', '1'),
+        create_item('ACME LTD', '3'),
+        create_item('Acme Widgets Ltd', '5'),
+        create_item('Beta\rLtd', '4'),
+        create_item('Beta\u2028Ltd', '6'),
+        create_item('Yak Ltd', '2'),
+        create_item('Zebra Ltd', '0'),
+    ]
+
+
+def test_mapped_index_search(index_path):
+    index = company_index.MappedIndex(index_path)
+
+    assert index.search('acme', limit=10) == [
+        create_item('Acme Ltd', '0'),
+        create_item('ACME LTD', '1'),
+        create_item('Acme Widgets Ltd', '2'),
+    ]
+    assert index.search(' ACME   w', limit=10) == [
+        create_item('Acme Widgets Ltd', '2'),
+    ]
+    assert index.search('acme', limit=1) == [create_item('Acme Ltd', '0')]
+    assert index.search('acmes', limit=10) == []
+    assert index.search('zz', limit=10) == []
+
+
+@pytest.mark.parametrize('content', (
+    b'',
+    b'not an index',
+    company_index.HEADER.pack(company_index.MAGIC, 10),
+))
+def test_mapped_index_invalid_file(tmpdir, content):
+    path = tmpdir.join('companies.idx')
+    path.write_binary(content)
+
+    with pytest.raises((ValueError, company_index.struct.error)):
+        company_index.MappedIndex(str(path))
+
+
+def test_company_name_index_without_file(tmpdir):
+    for path in ('', str(tmpdir.join('missing.idx'))):
+        index = company_index.CompanyNameIndex(path=path, check_interval=60)
+
+        assert index.search('acme', limit=10) is None
+
+
+def test_company_name_index_search(index_path):
+    index = company_index.CompanyNameIndex(path=index_path, check_interval=60)
+
+    assert len(index.search('acme', limit=10)) == 3
+    assert index.search('acmes', limit=10) is None
+
+
+@mock.patch('time.monotonic')
+def test_company_name_index_reloads_on_file_change(
+    mock_monotonic, index_path
+):
+    mock_monotonic.return_value = 100
+    index = company_index.CompanyNameIndex(path=index_path, check_interval=60)
+    assert index.search('zebra', limit=10) is not None
+
+    company_index.write_index(index_path, [create_company('Yak Ltd', '4')])
+    stat = os.stat(index_path)
+    os.utime(index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    mock_monotonic.return_value = 159
+    assert index.search('zebra', limit=10) is not None
+
+    mock_monotonic.return_value = 160
+    assert index.search('zebra', limit=10) is None
+    assert index.search('yak', limit=10) == [create_item('Yak Ltd', '4')]
+
+
+@mock.patch('time.monotonic')
+def test_company_name_index_keeps_index_on_invalid_file(
+    mock_monotonic, index_path, caplog
+):
+    mock_monotonic.return_value = 100
+    index = company_index.CompanyNameIndex(path=index_path, check_interval=60)
+    index.get()
+
+    with open(index_path + '.tmp', 'wb') as f:
+        f.write(b'corrupt!')
+    os.replace(index_path + '.tmp', index_path)
+    mock_monotonic.return_value = 160
+
+    assert index.search('acme', limit=10) is not None
+    assert caplog.records[-1].msg == index.MESSAGE_LOAD_FAILED
+
+
+def test_normalise_name():
+    assert company_index.normalise_name(' Acme\tWidgets  LTD ') == (
+        'acme widgets ltd'
+    )
@@ -1,5 +1,7 @@
 import json
-from unittest.mock import patch, Mock, PropertyMock
+import os
+import random
+from unittest.mock import call, patch, Mock, PropertyMock
 
 import pytest
 import requests
@@ -9,7 +11,7 @@ import requests_mock
 from django.shortcuts import Http404
 from django.urls import reverse
 
-from core import helpers
+from core import company_index, helpers
 from core.management.commands.download_geolocation_data import (
     GeolocationLocalFileArchive
 )
@@ -210,6 +212,113 @@ def test_geolocation_end_to_end(rf, ip_address, language, settings):
     assert 'a=b' in querysrtring
 
 
+@pytest.fixture
+def geoip_reader(tmpdir):
+    database = tmpdir.join('GeoLite2-Country.mmdb')
+    database.write('v1')
+    return helpers.GeoIPCountryReader(
+        path=str(database), max_size=10, timeout=60, check_interval=5
+    )
+
+
+@patch('time.monotonic', Mock(return_value=100))
+@patch('core.helpers.GeoIP2')
+def test_geoip_country_reader_opens_database_once(mock_geoip, geoip_reader):
+    mock_geoip().country.side_effect = lambda ip_address: {
+        'country_code': ip_address
+    }
+    mock_geoip.reset_mock()
+
+    for _ in range(2):
+        assert geoip_reader.country('1.1.1.1') == {'country_code': '1.1.1.1'}
+        assert geoip_reader.country('2.2.2.2') == {'country_code': '2.2.2.2'}
+
+    assert mock_geoip.call_args_list == [
+        call(geoip_reader.path, cache=mock_geoip.MODE_MMAP)
+    ]
+    assert mock_geoip().country.call_count == 2
+
+
+@patch('time.monotonic')
+@patch('core.helpers.GeoIP2')
+def test_geoip_country_reader_reopens_replaced_database(
+    mock_geoip, mock_monotonic, geoip_reader, tmpdir
+):
+    mock_monotonic.return_value = 100
+    geoip_reader.country('1.1.1.1')
+    replacement = tmpdir.join('replacement.mmdb')
+    replacement.write('v2')
+    os.replace(str(replacement), geoip_reader.path)
+
+    mock_monotonic.return_value = 104
+    geoip_reader.country('1.1.1.1')
+    assert mock_geoip.call_count == 1
+
+    mock_monotonic.return_value = 105
+    geoip_reader.country('1.1.1.1')
+    assert mock_geoip.call_count == 2
+    assert mock_geoip.return_value.country.call_count == 2
+
+    mock_monotonic.return_value = 110
+    geoip_reader.country('1.1.1.1')
+    assert mock_geoip.call_count == 2
+
+
+@patch('core.helpers.geoip_country_reader.country')
+@patch('core.helpers.get_client_ip', Mock(return_value=('8.8.8.8', True)))
+def test_geolocation_redirector_uses_shared_reader(mock_country, rf):
+    mock_country.return_value = {'country_code': 'DE'}
+    redirector = helpers.GeoLocationRedirector(rf.get('/'))
+
+    assert redirector.country_code == 'DE'
+    assert mock_country.call_args == call('8.8.8.8')
+
+
+@pytest.mark.parametrize('header_value,expected', (
+    ('DE', 'DE'),
+    ('jp', 'JP'),
+))
+@patch('core.helpers.geoip_country_reader.country')
+def test_geolocation_redirector_country_header(
+    mock_country, header_value, expected, rf, settings
+):
+    settings.GEOLOCATION_COUNTRY_HEADER = 'CloudFront-Viewer-Country'
+    request = rf.get('/', HTTP_CLOUDFRONT_VIEWER_COUNTRY=header_value)
+    redirector = helpers.GeoLocationRedirector(request)
+
+    assert redirector.country_code == expected
+    assert mock_country.call_count == 0
+    assert redirector.vary_headers == ['Cookie', 'CloudFront-Viewer-Country']
+
+
+@pytest.mark.parametrize('header_value', ('', 'XXX', '--'))
+@patch('core.helpers.geoip_country_reader.country')
+@patch('core.helpers.get_client_ip', Mock(return_value=('8.8.8.8', True)))
+def test_geolocation_redirector_invalid_country_header(
+    mock_country, header_value, rf, settings
+):
+    settings.GEOLOCATION_COUNTRY_HEADER = 'CloudFront-Viewer-Country'
+    mock_country.return_value = {'country_code': 'ES'}
+    request = rf.get('/', HTTP_CLOUDFRONT_VIEWER_COUNTRY=header_value)
+    redirector = helpers.GeoLocationRedirector(request)
+
+    assert redirector.country_code == 'ES'
+
+
+@patch('core.helpers.geoip_country_reader.country')
+@patch('core.helpers.get_client_ip', Mock(return_value=('8.8.8.8', True)))
+def test_geolocation_redirector_country_header_disabled(
+    mock_country, rf, settings
+):
+    settings.GEOLOCATION_COUNTRY_HEADER = ''
+    mock_country.return_value = {'country_code': 'ES'}
+    request = rf.get('/', HTTP_CLOUDFRONT_VIEWER_COUNTRY='DE')
+    redirector = helpers.GeoLocationRedirector(request)
+
+    assert redirector.country_code == 'ES'
+    assert redirector.vary_headers == ['Cookie']
+
+
 def test_search():
     with requests_mock.mock() as mock:
         mock.get(
@@ -234,6 +343,151 @@ def test_search_unauthorized():
             helpers.CompaniesHouseClient.search(term='green')
 
 
+def test_search_internal_ch_client(settings):
+    settings.FEATURE_FLAGS['INTERNAL_CH_ON'] = True
+    settings.INTERNAL_CH_BASE_URL = 'https://ch.example.com'
+
+    with requests_mock.mock() as mock:
+        mock.get('https://ch.example.com/api/search/companies/', json={})
+        for _ in range(2):
+            helpers.CompaniesHouseClient.search(term='green')
+
+    assert helpers.get_internal_ch_client() is (
+        helpers.get_internal_ch_client()
+    )
+    assert mock.call_count == 2
+    assert mock.request_history[0].query == 'q=green'
+    assert mock.request_history[0].timeout == (
+        settings.INTERNAL_CH_DEFAULT_TIMEOUT
+    )
+    assert 'X-Signature' in mock.request_history[0].headers
+
+
+def create_companies_house_search():
+    return helpers.CompaniesHouseSearch(max_size=10, timeout=60)
+
+
+def create_companies_response(titles, total_results=None):
+    body = {'items': [{'title': title} for title in titles]}
+    if total_results is not None:
+        body['total_results'] = total_results
+    return core.tests.helpers.create_response(200, body)
+
+
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_caches_terms(mock_search):
+    mock_search.return_value = create_companies_response(['ACME LTD'])
+    search = create_companies_house_search()
+
+    for term in ('Acme', ' acme ', 'ACME'):
+        assert search.search(term, client_id='1') == [{'title': 'ACME LTD'}]
+
+    assert mock_search.call_count == 1
+    assert mock_search.call_args == call(term='acme')
+
+
+@pytest.mark.parametrize('term', ('acme ltd', 'acme limited', 'acme uk'))
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_longer_term_calls_api(mock_search, term):
+    mock_search.return_value = create_companies_response(
+        ['ACME LTD'], total_results=1
+    )
+    search = create_companies_house_search()
+
+    search.search('acme', client_id='1')
+    search.search(term, client_id='1')
+
+    assert mock_search.call_count == 2
+    assert mock_search.call_args == call(term=term)
+
+
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_does_not_cache_errors(mock_search):
+    mock_search.return_value = core.tests.helpers.create_response(500)
+    search = create_companies_house_search()
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            search.search('acme', client_id='1')
+
+    assert mock_search.call_count == 2
+
+
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_shares_client_call(mock_search):
+    mock_search.return_value = create_companies_response(['ACME LTD'])
+    search = create_companies_house_search()
+    items = [{'title': 'ACME LTD'}]
+    search.in_flight.do = Mock(return_value=('acme', items))
+
+    assert search.search('Acme', client_id='1') == items
+    assert search.in_flight.do.call_args == call(
+        '1', search.fetch_shared, 'acme'
+    )
+    assert mock_search.call_count == 0
+
+
+@pytest.mark.parametrize('result', (
+    [{'title': 'ACME LTD'}],
+    requests.HTTPError(),
+))
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_waiter_fetches_own_term(mock_search, result):
+    mock_search.return_value = create_companies_response(['ACME LIMITED'])
+    search = create_companies_house_search()
+    # another search from the same client was in flight for 'acme'
+    search.in_flight.do = Mock(return_value=('acme', result))
+
+    assert search.search('acme lt', client_id='1') == [
+        {'title': 'ACME LIMITED'}
+    ]
+    assert search.in_flight.do.call_args == call(
+        '1', search.fetch_shared, 'acme lt'
+    )
+    assert mock_search.call_count == 1
+    assert mock_search.call_args == call(term='acme lt')
+
+
+def test_companies_house_search_raises_own_term_error():
+    search = create_companies_house_search()
+    search.in_flight.do = Mock(return_value=('acme', requests.HTTPError()))
+
+    with pytest.raises(requests.HTTPError):
+        search.search('acme', client_id='1')
+
+
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_uses_local_index(
+    mock_search, tmpdir, settings
+):
+    settings.COMPANIES_HOUSE_INDEX_SEARCH_LIMIT = 1
+    path = str(tmpdir.join('companies.idx'))
+    company_index.write_index(path, [
+        {
+            'title': title,
+            'company_number': '1',
+            'company_status': 'Active',
+            'postal_code': '',
+        } for title in ('ACME LTD', 'ACME PLC')
+    ])
+    mock_search.return_value = create_companies_response(['OTHER LTD'])
+    search = create_companies_house_search()
+
+    with patch.object(helpers.company_name_index, 'path', path):
+        assert search.search('acme', client_id='1') == [{
+            'title': 'ACME LTD',
+            'company_number': '1',
+            'company_status': 'Active',
+            'address': {'postal_code': ''},
+        }]
+        assert mock_search.call_count == 0
+
+        assert search.search('other', client_id='1') == [
+            {'title': 'OTHER LTD'}
+        ]
+        assert mock_search.call_count == 1
+
+
 ''' -- Search helpers -- '''
 
 
@@ -248,6 +502,39 @@ def test_sanitise_query(query, safe_output):
     assert helpers.sanitise_query(query) == safe_output
 
 
+@pytest.mark.parametrize('query', (
+    'AND OR NOT',
+    'AND AND OR OR NOT NOT',
+    '  AND\tOR  AND  ',
+    'OR AND AND OR',
+    'ANDOR NOTE ORDER',
+    'a AND-OR (b NOT c)',
+    '\\AND "quoted NOT',
+    'line "one\nline "two" three"',
+    '',
+))
+def test_sanitise_query_matches_legacy(query):
+    assert helpers.sanitise_query(query) == (
+        core.tests.helpers.legacy_sanitise_query(query)
+    )
+
+
+def test_sanitise_query_matches_legacy_random():
+    alphabet = [
+        'AND', 'OR', 'NOT', 'and', ' ', '  ', '\t', '\n', '"', 'a', 'Z',
+        '1', '_', '\\', '+', '-', '&', '|', '!', '(', ')', '{', '}', '[',
+        ']', '^', '~', '*', '?', ':', '/', "'", '.', 'é',
+    ]
+    generator = random.Random(0)
+    for _ in range(5000):
+        query = ''.join(
+            generator.choice(alphabet) for _ in range(generator.randint(0, 12))
+        )
+        assert helpers.sanitise_query(query) == (
+            core.tests.helpers.legacy_sanitise_query(query)
+        ), query
+
+
 @pytest.mark.parametrize('page,safe_output', (
     ("2", 2),
     ("-1", 1),
@@ -255,9 +542,11 @@ def test_sanitise_query(query, safe_output):
     ("$password = 1' or '1' = '1", 1),
     ("'search=keyword'and'1'='1'", 1),
     ("innocent search'dropdb();", 1),
-    ("{\"script\": \"ctx._source.viewings += 1}\"", 1)
+    ("{\"script\": \"ctx._source.viewings += 1}\"", 1),
+    ("5000", 100),
 ))
-def test_sanitise_page(page, safe_output):
+def test_sanitise_page(page, safe_output, settings):
+    settings.SEARCH_MAX_PAGE = 100
     assert helpers.sanitise_page(page) == safe_output
 
 
@@ -336,10 +625,57 @@ def test_parse_results(page, prev_pages,
        'show_first_page': show_first_page,
        'show_last_page': show_last_page,
        'first_item_number': first_item_number,
-       'last_item_number': last_item_number
+       'last_item_number': last_item_number,
+       'next_cursor': None,
     }
 
 
+def create_sorted_search_response(total, sort):
+    return Mock(status_code=200, content=json.dumps({
+        'hits': {
+            'total': total,
+            'hits': [{'_source': {'title': 'Result'}, 'sort': sort}],
+        }
+    }))
+
+
+def test_parse_results_next_cursor():
+    response = create_sorted_search_response(total=100, sort=[1.5, 'dit:1'])
+
+    context = helpers.parse_results(response, 'services', 2)
+
+    assert helpers.parse_search_cursor(
+        context['next_cursor'], 'services', 3
+    ) == [1.5, 'dit:1']
+    assert helpers.parse_results(response, 'services', 10)[
+        'next_cursor'
+    ] is None
+
+
+def test_parse_results_caps_pages(settings):
+    settings.SEARCH_MAX_PAGE = 5
+    response = create_sorted_search_response(total=100, sort=[1.5, 'dit:1'])
+
+    context = helpers.parse_results(response, 'services', 5)
+
+    assert context['total_pages'] == 5
+    assert context['next_pages'] == []
+    assert context['last_item_number'] == 50
+    assert context['next_cursor'] is None
+
+
+def test_parse_search_cursor():
+    cursor = helpers.build_search_cursor('services', 3, [1.5, 'dit:1'])
+
+    assert helpers.parse_search_cursor(
+        cursor, ' services ', 3
+    ) == [1.5, 'dit:1']
+    assert helpers.parse_search_cursor(cursor, 'services', 4) is None
+    assert helpers.parse_search_cursor(cursor, 'other', 3) is None
+    assert helpers.parse_search_cursor(cursor + 'x', 'services', 3) is None
+    assert helpers.parse_search_cursor('garbage', 'services', 3) is None
+
+
 def test_format_query():
     assert helpers.format_query("services", 2) == json.dumps({
         "query": {
@@ -352,11 +688,111 @@ def test_format_query():
               ]
           }
         },
+        "_source": ["type", "name", "content", "url"],
+        "sort": [{"_score": "desc"}, {"id": "asc"}],
         "from": 10,
         "size": 10
     })
 
 
+def test_format_query_search_after():
+    query = json.loads(
+        helpers.format_query("services", 3, search_after=[1.5, 'dit:1'])
+    )
+
+    assert query['from'] == 0
+    assert query['search_after'] == [1.5, 'dit:1']
+    assert query['sort'] == [{'_score': 'desc'}, {'id': 'asc'}]
+
+
+def test_format_query_size():
+    query = json.loads(helpers.format_query("services", 3, size=5))
+
+    assert query['from'] == 10
+    assert query['size'] == 5
+
+
+def create_suggester():
+    return helpers.SearchSuggester(
+        size=2, min_length=3, max_size=10, timeout=60, debounce_seconds=0.3
+    )
+
+
+def create_suggest_response(*titles):
+    return Mock(status_code=200, content=json.dumps({
+        'hits': {
+            'total': len(titles),
+            'hits': [{'_source': {'title': title}} for title in titles],
+        }
+    }))
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggester_caches_prefixes(mock_search):
+    mock_search.return_value = create_suggest_response('a', 'b', 'c')
+    suggester = create_suggester()
+
+    for query in ('Expo', ' expo ', 'EXPO'):
+        assert suggester.suggest(query, client_id=query) == {
+            'results': [{'title': 'a'}, {'title': 'b'}],
+            'is_debounced': False,
+        }
+
+    assert mock_search.call_count == 1
+    assert json.loads(mock_search.call_args[0][0])['size'] == 2
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggester_ignores_short_queries(mock_search):
+    suggester = create_suggester()
+
+    assert suggester.suggest('ex', client_id='1') == {
+        'results': [], 'is_debounced': False,
+    }
+    assert mock_search.call_count == 0
+
+
+@patch('time.monotonic')
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggester_debounces_client(mock_search, mock_monotonic):
+    mock_monotonic.return_value = 100
+    mock_search.return_value = create_suggest_response('a')
+    suggester = create_suggester()
+
+    suggester.suggest('expo', client_id='1')
+    mock_search.return_value = create_suggest_response('b')
+
+    assert suggester.suggest('expor', client_id='1') == {
+        'results': [{'title': 'a'}], 'is_debounced': True,
+    }
+    assert suggester.suggest('exit', client_id='1') == {
+        'results': [], 'is_debounced': True,
+    }
+    assert suggester.suggest('expor', client_id='2') == {
+        'results': [{'title': 'b'}], 'is_debounced': False,
+    }
+
+    mock_monotonic.return_value = 100.5
+    assert suggester.suggest('export', client_id='1') == {
+        'results': [{'title': 'b'}], 'is_debounced': False,
+    }
+    assert mock_search.call_count == 3
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggester_does_not_cache_errors(mock_search):
+    mock_search.return_value = Mock(
+        status_code=500,
+        raise_for_status=Mock(side_effect=requests.exceptions.HTTPError),
+    )
+    suggester = create_suggester()
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        suggester.suggest('expo', client_id='1')
+
+    assert suggester.results.get('expo') is None
+
+
 def test_search_with_activitystream():
     """ Simply check that it doesn't expload,
         and instead raises correct no-connection error
@@ -365,3 +801,56 @@ def test_search_with_activitystream():
         helpers.search_with_activitystream(
             helpers.format_query("Test", 1)
         )
+
+
+def test_search_with_activitystream_shared_session(settings):
+    with requests_mock.mock() as mock:
+        mock.get(settings.ACTIVITY_STREAM_API_URL, status_code=200)
+        for _ in range(2):
+            helpers.search_with_activitystream(
+                helpers.format_query("Test", 1)
+            )
+
+    assert mock.call_count == 2
+    assert mock.request_history[0].timeout == (
+        settings.ACTIVITY_STREAM_API_CONNECT_TIMEOUT,
+        settings.ACTIVITY_STREAM_API_READ_TIMEOUT,
+    )
+    assert mock.request_history[0].headers['Authorization'].startswith(
+        'Hawk '
+    )
+
+
+def test_build_pooled_session():
+    session = helpers.build_pooled_session(
+        pool_size=5, max_retries=3, backoff_factor=0.5
+    )
+
+    adapter = session.get_adapter('https://example.com')
+    assert adapter is session.get_adapter('http://example.com')
+    assert adapter._pool_maxsize == 5
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.connect == 3
+    assert adapter.max_retries.read == 0
+    assert adapter.max_retries.status == 0
+    assert adapter.max_retries.backoff_factor == 0.5
+    assert not adapter.max_retries.status_forcelist
+
+
+def test_get_pool_stats():
+    session = helpers.build_pooled_session(
+        pool_size=5, max_retries=0, backoff_factor=0
+    )
+    assert helpers.get_pool_stats(session) == []
+
+    adapter = session.get_adapter('https://example.com')
+    adapter.poolmanager.connection_from_url('https://example.com')
+
+    assert helpers.get_pool_stats(session) == [{
+        'host': 'example.com',
+        'port': 443,
+        'pool_size': 5,
+        'connections_in_use': 0,
+        'connections_opened': 0,
+        'requests': 0,
+    }]
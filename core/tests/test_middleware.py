@@ -110,3 +110,70 @@ def test_force_default_locale_sets_to_prevous_on_response(rf):
 
     instance.process_response(request, None)
     assert translation.get_language() == 'de'
+
+
+def test_redirect_table_middleware_installed():
+    assert (
+        'core.middleware.RedirectTableMiddleware' in
+        settings.MIDDLEWARE_CLASSES
+    )
+
+
+def test_redirect_table_middleware_after_locale_middleware():
+    middleware_classes = settings.MIDDLEWARE_CLASSES
+
+    assert (
+        middleware_classes.index('django.middleware.locale.LocaleMiddleware') <
+        middleware_classes.index('core.middleware.RedirectTableMiddleware')
+    )
+
+
+def test_redirect_table_middleware_language_cookie(client):
+    # left active on the thread by a previous request
+    translation.activate('ja')
+
+    response = client.get('/future/')
+
+    assert response.status_code == 302
+    cookie = response.cookies[settings.LANGUAGE_COOKIE_NAME]
+    assert cookie.value == settings.LANGUAGE_CODE
+
+
+def test_redirect_table_middleware_redirects(rf):
+    request = rf.get('/new/', {'a': 'b'})
+    instance = middleware.RedirectTableMiddleware()
+
+    response = instance.process_request(request)
+
+    assert response.status_code == 302
+    assert response.url == '/advice/?a=b'
+
+
+def test_redirect_table_middleware_case_insensitive(rf):
+    request = rf.get('/INNOVATION-HK/')
+    instance = middleware.RedirectTableMiddleware()
+
+    response = instance.process_request(request)
+
+    assert response.status_code == 302
+    assert response.url == (
+        'https://www.events.great.gov.uk/ehome/innovation-hk'
+    )
+
+
+def test_redirect_table_middleware_appends_slash(rf):
+    request = rf.get('/new', {'a': 'b'})
+    instance = middleware.RedirectTableMiddleware()
+
+    response = instance.process_request(request)
+
+    assert response.status_code == 301
+    assert response.url == '/new/?a=b'
+
+
+def test_redirect_table_middleware_ignores_other_paths(rf):
+    request = rf.get(reverse('landing-page-international'))
+    instance = middleware.RedirectTableMiddleware()
+
+    assert instance.process_request(request) is None
+    assert instance.process_request(rf.get('/opportunities/thing/')) is None
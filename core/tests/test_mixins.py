@@ -1,10 +1,13 @@
+import threading
 from unittest import mock
 
 import pytest
 import requests_mock
 
+from django.http import Http404
 from django.views.generic import TemplateView
 from django.utils import translation
+from django.utils.functional import cached_property
 
 from core import mixins
 
@@ -125,3 +128,48 @@ def test_retrieve_company_profile_mixin_name_guessing(
         mocked.get(url, json=expected)
         assert mixin.guess_given_name == first_name
         assert mixin.guess_family_name == last_name
+
+
+def test_prefetch_cms_mixin_resolves_concurrently(rf):
+    barrier = threading.Barrier(2, timeout=5)
+    languages = []
+
+    class View(mixins.PrefetchCMSMixin, TemplateView):
+        template_name = 'thing.html'
+
+        def lookup(self):
+            languages.append(translation.get_language())
+            barrier.wait()
+            return {'title': 'the page'}
+
+        @cached_property
+        def page(self):
+            return self.lookup()
+
+        @cached_property
+        def cms_component(self):
+            return self.lookup()
+
+    view = View()
+    view.request = rf.get('/')
+    with translation.override('de'):
+        view.prefetch_cms()
+
+    assert view.__dict__['page'] == {'title': 'the page'}
+    assert view.__dict__['cms_component'] == {'title': 'the page'}
+    assert languages == ['de', 'de']
+
+
+def test_prefetch_cms_mixin_raises_lookup_errors(rf):
+    class View(mixins.PrefetchCMSMixin, TemplateView):
+        template_name = 'thing.html'
+        prefetch_cms_attributes = ('page',)
+
+        @property
+        def page(self):
+            raise Http404()
+
+    view = View.as_view()
+
+    with pytest.raises(Http404):
+        view(rf.get('/'))
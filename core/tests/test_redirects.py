@@ -0,0 +1,160 @@
+import os
+from unittest import mock
+
+from django.conf.urls import url
+from django.views.generic.base import RedirectView
+
+from core import redirects
+from core.views import QuerystringRedirectView, TranslationRedirectView
+
+
+@mock.patch('time.monotonic', mock.Mock(return_value=100))
+def create_store(tmpdir, entries, check_interval=5):
+    path = str(tmpdir.join('redirects.json'))
+    redirects.write_entries(path, entries)
+    store = redirects.RedirectStore(path=path, check_interval=check_interval)
+    store.get()
+    return store
+
+
+def test_get_literal_path():
+    view = QuerystringRedirectView.as_view(url='/')
+
+    assert redirects.get_literal_path(url(r'^a/b-c/$', view)) == '/a/b-c/'
+    assert redirects.get_literal_path(url(r'^(?i)a/$', view)) == '/a/'
+    assert redirects.get_literal_path(url(r'^a/(?P<b>\w+)/$', view)) is None
+    assert redirects.get_literal_path(url(r'^a/', view)) is None
+
+
+def test_pattern_to_entry():
+    assert redirects.pattern_to_entry(url(
+        r'^(?i)thing/$', QuerystringRedirectView.as_view(url='/to/'),
+    )) == {'path': '/thing/', 'case_insensitive': True, 'url': '/to/'}
+    assert redirects.pattern_to_entry(url(
+        r'^de/$',
+        TranslationRedirectView.as_view(pattern_name='home', language='de'),
+    )) == {
+        'path': '/de/',
+        'view': 'translation',
+        'language': 'de',
+        'pattern_name': 'home',
+    }
+    assert redirects.pattern_to_entry(url(
+        r'^thing/$', RedirectView.as_view(url='/to/', permanent=True),
+    )) == {
+        'path': '/thing/', 'view': 'redirect', 'permanent': True, 'url': '/to/'
+    }
+    assert redirects.pattern_to_entry(url(
+        r'^thing/(?P<slug>\w+)/$', QuerystringRedirectView.as_view(url='/'),
+    )) is None
+
+
+def test_write_entries_one_per_line(tmpdir):
+    path = str(tmpdir.join('redirects.json'))
+    entries = [{'path': '/a/', 'url': '/b/'}, {'path': '/c/', 'url': '/d/'}]
+
+    redirects.write_entries(path, entries)
+
+    assert tmpdir.join('redirects.json').read() == (
+        '[\n'
+        '  {"path": "/a/", "url": "/b/"},\n'
+        '  {"path": "/c/", "url": "/d/"}\n'
+        ']\n'
+    )
+    assert redirects.read_entries(path) == entries
+
+
+def test_redirect_table_lookup(rf):
+    table = redirects.RedirectTable([
+        {'path': '/exact/', 'url': '/a/'},
+        {'path': '/Case/', 'case_insensitive': True, 'url': '/b/'},
+    ])
+
+    assert len(table) == 2
+    assert table.lookup('/EXACT/') is None
+    assert table.lookup('/other/') is None
+    assert table.get_response(rf.get('/exact/'), '/exact/').url == '/a/'
+    assert table.get_response(rf.get('/CASE/'), '/CASE/').url == '/b/'
+    assert table.get_response(rf.get('/case/'), '/case/').url == '/b/'
+    assert table.get_response(rf.get('/other/'), '/other/') is None
+
+
+def test_redirect_table_view_types(rf):
+    table = redirects.RedirectTable([
+        {'path': '/a/', 'view': 'redirect', 'url': '/to/'},
+        {
+            'path': '/b/',
+            'view': 'translation',
+            'language': 'de',
+            'url': '/to/',
+        },
+    ])
+
+    response = table.get_response(rf.get('/a/', {'x': 'y'}), '/a/')
+    assert response.url == '/to/'
+    response = table.get_response(rf.get('/b/', {'x': 'y'}), '/b/')
+    assert response.url == '/to/?x=y&lang=de'
+
+
+def test_redirects_file_loads(settings):
+    entries = redirects.read_entries(settings.REDIRECTS_FILE)
+
+    table = redirects.RedirectTable(entries)
+
+    assert len(table) == len(entries)
+    assert len({entry['path'] for entry in entries}) == len(entries)
+
+
+def test_redirect_store_loads_table(tmpdir):
+    store = create_store(tmpdir, [{'path': '/a/', 'url': '/b/'}])
+
+    assert store.get().lookup('/a/') is not None
+
+
+@mock.patch('time.monotonic')
+def test_redirect_store_reloads_on_file_change(mock_monotonic, tmpdir):
+    store = create_store(tmpdir, [{'path': '/a/', 'url': '/b/'}])
+    mtime = os.stat(store.path).st_mtime
+    redirects.write_entries(store.path, [{'path': '/c/', 'url': '/d/'}])
+    os.utime(store.path, (mtime + 10, mtime + 10))
+
+    mock_monotonic.return_value = 104
+    assert store.get().lookup('/c/') is None
+
+    mock_monotonic.return_value = 105
+    assert store.get().lookup('/c/') is not None
+    assert store.get().lookup('/a/') is None
+
+
+@mock.patch('time.monotonic', mock.Mock(return_value=101))
+def test_redirect_store_reloads_on_request(tmpdir):
+    store = create_store(tmpdir, [{'path': '/a/', 'url': '/b/'}])
+    stat = os.stat(store.path)
+    redirects.write_entries(store.path, [{'path': '/c/', 'url': '/d/'}])
+    os.utime(store.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert store.get().lookup('/c/') is None
+
+    store.request_reload()
+
+    assert store.get().lookup('/c/') is not None
+
+
+@mock.patch('time.monotonic', mock.Mock(return_value=101))
+def test_redirect_store_keeps_table_on_invalid_file(tmpdir, caplog):
+    store = create_store(tmpdir, [{'path': '/a/', 'url': '/b/'}])
+    tmpdir.join('redirects.json').write('[{"path": ')
+
+    store.request_reload()
+
+    assert store.get().lookup('/a/') is not None
+    assert caplog.records[-1].msg == store.MESSAGE_LOAD_FAILED
+
+
+@mock.patch('signal.signal')
+def test_install_reload_signal_handler(mock_signal):
+    redirects.install_reload_signal_handler()
+
+    assert mock_signal.call_args == mock.call(
+        redirects.signal.SIGHUP, redirects.redirect_store.request_reload
+    )
@@ -1,19 +1,22 @@
 import json
 import http
+import urllib.parse
 from unittest.mock import call, patch, PropertyMock, Mock
 
 import requests
 
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import caches
 from django.views.generic import TemplateView
 
 from bs4 import BeautifulSoup
+from mohawk import Sender
 import pytest
 import requests_mock
 from rest_framework import status
 
-from core import helpers, views
+from core import cache, helpers, views
 from core.tests.helpers import create_response
 from casestudy import casestudies
 
@@ -48,6 +51,28 @@ def test_landing_page_redirect(client):
     assert response.cookies[helpers.GeoLocationRedirector.COOKIE_NAME].value
 
 
+@patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_landing_page_country_header(mock_get_page, client, settings):
+    settings.GEOLOCATION_COUNTRY_HEADER = 'CloudFront-Viewer-Country'
+    mock_get_page.return_value = create_response(status_code=200)
+
+    redirect_response = client.get(
+        reverse('landing-page'), HTTP_CLOUDFRONT_VIEWER_COUNTRY='DE'
+    )
+    response = client.get(
+        reverse('landing-page'), HTTP_CLOUDFRONT_VIEWER_COUNTRY='GB'
+    )
+
+    assert redirect_response.status_code == 302
+    assert redirect_response.url == (
+        reverse('landing-page-international') + '?lang=de'
+    )
+    assert response.status_code == 200
+    for item in (redirect_response, response):
+        assert 'CloudFront-Viewer-Country' in item['Vary']
+        assert 'Cookie' in item['Vary']
+
+
 @patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
 def test_landing_page(mock_get_page, client, settings):
     settings.FEATURE_FLAGS['NEWS_SECTION_ON'] = False
@@ -92,6 +117,7 @@ def test_landing_page_video_url(mock_get_page, client, settings):
     settings.FEATURE_FLAGS['LANDING_PAGE_EU_EXIT_BANNER_ON'] = False
 
     settings.LANDING_PAGE_VIDEO_URL = 'https://example.com/videp.mp4'
+    mock_get_page.return_value = create_response(status_code=200)
 
     url = reverse('landing-page')
     response = client.get(url)
@@ -553,6 +579,7 @@ def test_search_view(client):
                 }
             ]
 
+        caches['default'].clear()
         """ What if there are no results? """
         search.return_value = Mock(
             status_code=200,
@@ -578,6 +605,7 @@ def test_search_view(client):
         assert response.status_code == 200
         assert context['results'] == []
 
+        caches['default'].clear()
         """ What if ActivitySteam sends an error? """
         search.return_value = Mock(status_code=500,
                                    content="[service overloaded]")
@@ -590,6 +618,7 @@ def test_search_view(client):
         assert context['error_message'] == "[service overloaded]"
         assert context['error_status_code'] == 500
 
+        caches['default'].clear()
         """ What if ActivitySteam is down? """
         search.side_effect = requests.exceptions.ConnectionError
 
@@ -602,6 +631,152 @@ def test_search_view(client):
         assert context['error_status_code'] == 500
 
 
+def create_search_response(total=1):
+    return Mock(status_code=200, content=json.dumps({
+        'hits': {
+            'total': total,
+            'hits': [{'_source': {'title': 'Result'}}] * total,
+        }
+    }))
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_view_caches_results(mock_search, client):
+    mock_search.return_value = create_search_response()
+
+    for query in ('services', ' services  ', 'services'):
+        response = client.get(reverse('search'), data={'q': query})
+        assert response.context_data['results'] == [{'title': 'Result'}]
+        assert response.context_data['query'] == query
+
+    assert mock_search.call_count == 1
+
+    client.get(reverse('search'), data={'q': 'services', 'page': '2'})
+    client.get(reverse('search'), data={'q': 'other'})
+
+    assert mock_search.call_count == 3
+
+
+@pytest.mark.parametrize('search_kwargs', (
+    {'return_value': Mock(status_code=500, content='[service overloaded]')},
+    {'side_effect': requests.exceptions.ConnectionError},
+))
+@patch('core.helpers.search_with_activitystream')
+def test_search_view_caches_errors_briefly(
+    mock_search, search_kwargs, client, settings
+):
+    settings.SEARCH_ERROR_CACHE_EXPIRE_SECONDS = 10
+    mock_search.configure_mock(**search_kwargs)
+
+    with patch.object(caches['default'], 'set', wraps=caches['default'].set):
+        for _ in range(2):
+            response = client.get(reverse('search'), data={'q': 'services'})
+            assert response.context_data['error_status_code'] == 500
+        timeout = caches['default'].set.call_args[0][2]
+
+    assert mock_search.call_count == 1
+    assert timeout == 10
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_view_renders_requested_fields(mock_search, client):
+    source = {field: 'value-' + field for field in helpers.RESULT_FIELDS}
+    mock_search.return_value = Mock(status_code=200, content=json.dumps({
+        'hits': {'total': 1, 'hits': [{'_source': source}]}
+    }))
+
+    response = client.get(reverse('search'), data={'q': 'services'})
+
+    content = response.content.decode()
+    for value in source.values():
+        assert value in content
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_view_cursor(mock_search, client):
+    mock_search.return_value = create_search_response()
+    cursor = helpers.build_search_cursor('services', 3, [1.5, 'dit:1'])
+
+    client.get(reverse('search'), data={'q': 'services', 'page': '3'})
+    caches['default'].clear()
+    client.get(
+        reverse('search'),
+        data={'q': 'services', 'page': '3', 'cursor': cursor},
+    )
+    caches['default'].clear()
+    client.get(
+        reverse('search'),
+        data={'q': 'services', 'page': '4', 'cursor': cursor},
+    )
+
+    queries = [json.loads(call[0][0]) for call in mock_search.call_args_list]
+    assert queries[0]['from'] == 20
+    assert 'search_after' not in queries[0]
+    assert queries[1]['from'] == 0
+    assert queries[1]['search_after'] == [1.5, 'dit:1']
+    assert 'search_after' not in queries[2]
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_view_next_link_has_cursor(mock_search, client):
+    mock_search.return_value = Mock(status_code=200, content=json.dumps({
+        'hits': {
+            'total': 30,
+            'hits': [{'_source': {'title': 'Result'}, 'sort': [1.5, 'a']}],
+        }
+    }))
+
+    response = client.get(reverse('search'), data={'q': 'services'})
+
+    next_cursor = response.context_data['next_cursor']
+    assert helpers.parse_search_cursor(next_cursor, 'services', 2) == [
+        1.5, 'a'
+    ]
+    soup = BeautifulSoup(response.content, 'html.parser')
+    href = soup.find('a', {'class': 'next'})['href']
+    assert urllib.parse.parse_qs(urllib.parse.urlsplit(href).query) == {
+        'q': ['services'], 'page': ['2'], 'cursor': [next_cursor],
+    }
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggest_api_view(mock_search, client):
+    mock_search.return_value = create_search_response(total=1)
+
+    response = client.get(reverse('search-suggest'), data={'q': 'Services'})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'query': 'Services',
+        'results': [{'title': 'Result'}],
+        'is_debounced': False,
+    }
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggest_api_view_debounced(mock_search, client):
+    mock_search.return_value = create_search_response(total=1)
+
+    client.get(reverse('search-suggest'), data={'q': 'serv'})
+    response = client.get(reverse('search-suggest'), data={'q': 'servi'})
+
+    assert response.json()['is_debounced'] is True
+    assert response.json()['results'] == [{'title': 'Result'}]
+    assert mock_search.call_count == 1
+
+
+@patch('core.helpers.search_with_activitystream')
+def test_search_suggest_api_view_error(mock_search, client):
+    mock_search.side_effect = requests.exceptions.ConnectionError
+
+    response = client.get(reverse('search-suggest'), data={'q': 'services'})
+
+    assert response.status_code == 502
+    assert response.json() == {
+        'error_message': 'Activity Stream connection failed'
+    }
+
+
 cms_urls_slugs = (
     (
         reverse('privacy-and-cookies'),
@@ -1028,7 +1203,7 @@ def test_companies_house_search_api_success(mock_search, client, settings):
     assert response.content == b'[{"name": "Smashing corp"}]'
 
 
-@patch('core.helpers.CompanyCHClient')
+@patch('core.helpers.PooledCompanyCHClient')
 def test_companies_house_search_internal(mocked_ch_client, client, settings):
     settings.FEATURE_FLAGS['INTERNAL_CH_ON'] = True
 
@@ -1041,3 +1216,213 @@ def test_companies_house_search_internal(mocked_ch_client, client, settings):
 
     assert response.status_code == 200
     assert response.content == b'[{"name": "Smashing corp"}]'
+
+
+@patch('core.helpers.CompaniesHouseClient.search')
+def test_companies_house_search_api_cached(mock_search, client, settings):
+    settings.FEATURE_FLAGS['INTERNAL_CH_ON'] = False
+    mock_search.return_value = create_response(200, {
+        'items': [{'title': 'ACME LTD'}, {'title': 'ACME WIDGETS'}],
+        'total_results': 2,
+    })
+    url = reverse('api-internal-companies-house-search')
+
+    client.get(url, data={'term': 'Acme'})
+    response = client.get(url, data={'term': 'acme '})
+
+    assert response.json() == [
+        {'title': 'ACME LTD'}, {'title': 'ACME WIDGETS'}
+    ]
+    assert mock_search.call_count == 1
+
+
+@pytest.fixture
+def cms_webhook_settings(settings):
+    settings.CMS_WEBHOOK_HAWK_ACCESS_KEY = 'cms-webhook-id'
+    settings.CMS_WEBHOOK_HAWK_SECRET_KEY = 'cms-webhook-secret'
+    return settings
+
+
+def sign_cms_webhook_request(url, content, key='cms-webhook-secret'):
+    return Sender(
+        {'id': 'cms-webhook-id', 'key': key, 'algorithm': 'sha256'},
+        url,
+        'POST',
+        content=content,
+        content_type='application/json',
+    ).request_header
+
+
+@patch('directory_cms_client.client.cms_api_client.lookup_by_slug')
+def test_cms_cache_invalidation(
+    mock_lookup_by_slug, cms_webhook_settings, client
+):
+    mock_lookup_by_slug.return_value = create_response(
+        status_code=200, json_body={'title': 'the page'}
+    )
+    for language_code in ['en-gb', 'de']:
+        cache.lookup_by_slug(
+            handler=helpers.handle_cms_response,
+            slug='the-slug',
+            language_code=language_code,
+        )
+    cache.lookup_by_slug(
+        handler=helpers.handle_cms_response,
+        slug='the-listing',
+        language_code='en-gb',
+    )
+    url = reverse('api-internal-cms-cache-invalidation')
+    content = json.dumps({
+        'slug': 'the-slug', 'related_slugs': ['the-listing'],
+    })
+
+    response = client.post(
+        url,
+        content,
+        content_type='application/json',
+        HTTP_AUTHORIZATION=sign_cms_webhook_request(
+            'http://testserver' + url, content
+        ),
+    )
+
+    assert response.status_code == 200
+    key = cache.CMSPageCache.build_key(
+        'lookup_by_slug', slug='the-slug', language_code='de'
+    )
+    assert key in response.json()['evicted']
+    for slug, language_code in [
+        ('the-slug', 'en-gb'), ('the-slug', 'de'), ('the-listing', 'en-gb')
+    ]:
+        key = cache.CMSPageCache.build_key(
+            'lookup_by_slug', slug=slug, language_code=language_code
+        )
+        assert cache.cms_page_cache.get(key) is None
+
+
+def test_cms_cache_invalidation_tags(cms_webhook_settings, client):
+    key = cache.CMSPageCache.build_key('lookup_by_tag', slug='the-tag')
+    cache.cms_page_cache.set(key, {'name': 'the tag'})
+    url = reverse('api-internal-cms-cache-invalidation')
+    content = json.dumps({'slug': 'the-slug', 'tags': ['the-tag']})
+
+    response = client.post(
+        url,
+        content,
+        content_type='application/json',
+        HTTP_AUTHORIZATION=sign_cms_webhook_request(
+            'http://testserver' + url, content
+        ),
+    )
+
+    assert response.status_code == 200
+    assert cache.cms_page_cache.get(key) is None
+
+
+@pytest.mark.parametrize('authorization', ('missing', 'unknown', 'forged'))
+def test_cms_cache_invalidation_unauthorized(
+    authorization, cms_webhook_settings, client
+):
+    key = cache.CMSPageCache.build_key('lookup_by_slug', slug='the-slug')
+    cache.cms_page_cache.set(key, {'title': 'the page'})
+    url = reverse('api-internal-cms-cache-invalidation')
+    content = '{"slug": "the-slug"}'
+    headers = {
+        'missing': {},
+        'unknown': {'HTTP_AUTHORIZATION': 'Hawk id="nope"'},
+        'forged': {
+            'HTTP_AUTHORIZATION': sign_cms_webhook_request(
+                'http://testserver' + url, content, key='wrong-secret'
+            )
+        },
+    }[authorization]
+
+    response = client.post(
+        url, content, content_type='application/json', **headers
+    )
+
+    assert response.status_code == 401
+    assert cache.cms_page_cache.get(key)['page'] == {'title': 'the page'}
+
+
+def test_cms_cache_invalidation_replay(cms_webhook_settings, client):
+    url = reverse('api-internal-cms-cache-invalidation')
+    content = '{"slug": "the-slug"}'
+    authorization = sign_cms_webhook_request(
+        'http://testserver' + url, content
+    )
+
+    responses = [
+        client.post(
+            url, content, content_type='application/json',
+            HTTP_AUTHORIZATION=authorization,
+        )
+        for _ in range(2)
+    ]
+
+    assert [response.status_code for response in responses] == [200, 401]
+
+
+def test_cms_cache_invalidation_not_configured(settings, client):
+    settings.CMS_WEBHOOK_HAWK_ACCESS_KEY = 'cms-webhook-id'
+    settings.CMS_WEBHOOK_HAWK_SECRET_KEY = ''
+    url = reverse('api-internal-cms-cache-invalidation')
+    content = '{"slug": "the-slug"}'
+
+    response = client.post(
+        url, content, content_type='application/json',
+        HTTP_AUTHORIZATION=sign_cms_webhook_request(
+            'http://testserver' + url, content, key=''
+        ),
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize('content', (
+    'not json',
+    '["the-slug"]',
+    '{"not-slug": "the-slug"}',
+    '{"slug": 1}',
+    '{"slug": ["the-slug"]}',
+    '{"slug": "the-slug", "service_name": 1}',
+    '{"slug": "the-slug", "related_slugs": "the-listing"}',
+    '{"slug": "the-slug", "related_slugs": [null]}',
+    '{"slug": "the-slug", "tags": "the-tag"}',
+    '{"slug": "the-slug", "tags": [{"slug": "the-tag"}]}',
+))
+def test_cms_cache_invalidation_bad_payload(
+    cms_webhook_settings, client, content
+):
+    url = reverse('api-internal-cms-cache-invalidation')
+
+    response = client.post(
+        url, content, content_type='application/json',
+        HTTP_AUTHORIZATION=sign_cms_webhook_request(
+            'http://testserver' + url, content
+        ),
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Invalid payload'}
+
+
+@patch('core.helpers.get_activity_stream_pool_stats')
+def test_pool_stats(mock_get_pool_stats, client, settings):
+    settings.DIRECTORY_HEALTHCHECK_TOKEN = 'debug'
+    mock_get_pool_stats.return_value = [{'host': 'example.com'}]
+    url = reverse('healthcheck:pools')
+
+    response = client.get(url, {'token': 'debug'})
+
+    assert response.status_code == 200
+    assert response.json() == {'activity_stream': [{'host': 'example.com'}]}
+    assert 'no-cache' in response['Cache-Control']
+
+
+@pytest.mark.parametrize('params', ({}, {'token': 'wrong'}))
+def test_pool_stats_forbidden(params, client, settings):
+    settings.DIRECTORY_HEALTHCHECK_TOKEN = 'debug'
+
+    response = client.get(reverse('healthcheck:pools'), params)
+
+    assert response.status_code == 403
@@ -1,21 +1,30 @@
+import hashlib
+import json
 import logging
+
+from mohawk.exc import HawkFail
 from requests.exceptions import RequestException
 
 from directory_constants.constants import cms, urls
-from directory_cms_client.client import cms_api_client
 from directory_forms_api_client.helpers import FormSessionMixin, Sender
+from ipware import get_client_ip
 
 from django.conf import settings
 from django.contrib import sitemaps
-from django.http import JsonResponse
+from django.core.cache import caches
+from django.http import HttpResponseForbidden, JsonResponse
 from django.urls import reverse, RegexURLResolver
-from django.utils.cache import set_response_etag
+from django.utils.cache import patch_vary_headers, set_response_etag
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import FormView, TemplateView
 from django.views.generic.base import RedirectView, View
 from django.utils.functional import cached_property
 
 from casestudy import casestudies
-from core import helpers, mixins, forms
+from core import cache, helpers, mixins, forms
 from euexit.mixins import (
     HideLanguageSelectorMixin, EUExitFormsFeatureFlagMixin
 )
@@ -36,17 +45,20 @@ class LandingPageView(TemplateView):
 
     @cached_property
     def page(self):
-        response = cms_api_client.lookup_by_slug(
+        return cache.lookup_by_slug(
+            handler=helpers.handle_cms_response_allow_404,
             slug=cms.GREAT_HOME_SLUG,
             draft_token=self.request.GET.get('draft_token'),
         )
-        return helpers.handle_cms_response_allow_404(response)
 
     def get(self, request, *args, **kwargs):
         redirector = helpers.GeoLocationRedirector(self.request)
         if redirector.should_redirect:
-            return redirector.get_response()
-        return super().get(request, *args, **kwargs)
+            response = redirector.get_response()
+        else:
+            response = super().get(request, *args, **kwargs)
+        patch_vary_headers(response, redirector.vary_headers)
+        return response
 
     def get_context_data(self, *args, **kwargs):
         return super().get_context_data(
@@ -75,6 +87,7 @@ class CampaignPageView(
 
 class InternationalLandingPageView(
     mixins.TranslationsMixin,
+    mixins.PrefetchCMSMixin,
     mixins.GetCMSPageMixin,
     mixins.GetCMSComponentMixin,
     TemplateView,
@@ -265,11 +278,117 @@ class CompaniesHouseSearchApiView(View):
         form = self.form_class(data=request.GET)
         if not form.is_valid():
             return JsonResponse(form.errors, status=400)
-        api_response = helpers.CompaniesHouseClient.search(
-            term=form.cleaned_data['term']
+        client_ip, _ = get_client_ip(request)
+        items = helpers.companies_house_search.search(
+            term=form.cleaned_data['term'], client_id=client_ip,
         )
-        api_response.raise_for_status()
-        return JsonResponse(api_response.json()['items'], safe=False)
+        return JsonResponse(items, safe=False)
+
+
+class SearchSuggestApiView(View):
+    """Top results for a partially typed search, for search-as-you-type.
+
+        URL parameters: 'q'    Partial string to be searched
+    """
+
+    def get_client_id(self):
+        client_ip, _ = get_client_ip(self.request)
+        user_agent = self.request.META.get('HTTP_USER_AGENT', '')
+        return hashlib.sha256(
+            '{0}:{1}'.format(client_ip, user_agent).encode()
+        ).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        query = helpers.sanitise_query(request.GET.get('q', ''))
+        try:
+            suggestions = helpers.search_suggester.suggest(
+                query=query, client_id=self.get_client_id()
+            )
+        except RequestException:
+            logger.error(
+                "Activity Stream connection for search suggestions failed",
+                exc_info=True,
+            )
+            return JsonResponse(
+                {'error_message': 'Activity Stream connection failed'},
+                status=502,
+            )
+        return JsonResponse({'query': query, **suggestions})
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CMSCacheInvalidationApiView(View):
+    """Called by the CMS on publish to evict a page from the CMS caches.
+
+    Expects a Hawk-signed JSON body with the `slug` of the published page,
+    plus optional `service_name`, `tags` the page is tagged with, and
+    `related_slugs` of listing pages that include it.
+
+    """
+
+    http_method_names = ['post']
+
+    @staticmethod
+    def is_valid_payload(payload):
+        def is_list_of_str(value):
+            return (
+                isinstance(value, list) and
+                all(isinstance(item, str) for item in value)
+            )
+
+        return (
+            isinstance(payload, dict) and
+            isinstance(payload.get('slug'), str) and
+            isinstance(payload.get('service_name', ''), (str, type(None))) and
+            is_list_of_str(payload.get('related_slugs', [])) and
+            is_list_of_str(payload.get('tags', []))
+        )
+
+    def post(self, request, *args, **kwargs):
+        try:
+            helpers.authenticate_cms_webhook(request)
+        except HawkFail:
+            logger.warning('CMS webhook authentication failed', exc_info=True)
+            return JsonResponse({'detail': 'Unauthorized'}, status=401)
+        try:
+            payload = json.loads(request.body.decode('utf-8'))
+        except ValueError:
+            payload = None
+        if not self.is_valid_payload(payload):
+            return JsonResponse({'detail': 'Invalid payload'}, status=400)
+
+        slug = payload['slug']
+        service_name = payload.get('service_name')
+        evicted = []
+        for page_slug in [slug] + payload.get('related_slugs', []):
+            evicted += cache.cms_page_cache.evict(
+                'lookup_by_slug', slug=page_slug, service_name=service_name
+            )
+        for tag_slug in payload.get('tags', []):
+            evicted += cache.cms_page_cache.evict(
+                'lookup_by_tag', slug=tag_slug, service_name=service_name
+            )
+        return JsonResponse({'evicted': evicted})
+
+
+class PoolStatsView(View):
+    """Usage of this process's Activity Stream connection pool, for sizing
+    ACTIVITY_STREAM_API_POOL_SIZE. Guarded by the healthcheck token.
+
+    """
+
+    http_method_names = ['get']
+
+    @method_decorator(never_cache)
+    def get(self, request, *args, **kwargs):
+        is_permitted = constant_time_compare(
+            request.GET.get('token', ''), settings.DIRECTORY_HEALTHCHECK_TOKEN
+        )
+        if not is_permitted:
+            return HttpResponseForbidden()
+        return JsonResponse({
+            'activity_stream': helpers.get_activity_stream_pool_stats(),
+        })
 
 
 class SendNotifyMessagesMixin:
@@ -311,15 +430,17 @@ class BaseNotifyFormView(FormSessionMixin, SendNotifyMessagesMixin, FormView):
 class SearchView(TemplateView):
     """ Search results page.
 
-        URL parameters: 'q'    String to be searched
-                        'page' Int results page number
+        URL parameters: 'q'      String to be searched
+                        'page'   Int results page number
+                        'cursor' Optional opaque cursor for the page
     """
     template_name = 'core/search.html'
 
-    def get_context_data(self, **kwargs):
-        query = helpers.sanitise_query(self.request.GET.get('q', ''))
-        page = helpers.sanitise_page(self.request.GET.get('page', '1'))
-        elasticsearch_query = helpers.format_query(query, page)
+    def search(self, query, page, search_after=None):
+        """Returns the results context and how long it can be cached for."""
+        elasticsearch_query = helpers.format_query(
+            query, page, search_after=search_after
+        )
 
         try:
             response = helpers.search_with_activitystream(elasticsearch_query)
@@ -329,14 +450,31 @@ class SearchView(TemplateView):
             return {
                 'error_status_code': 500,
                 'error_message': "Activity Stream connection failed",
-                'query': query
-            }
+            }, settings.SEARCH_ERROR_CACHE_EXPIRE_SECONDS
         else:
             if response.status_code != 200:
                 return {
                     'error_message': response.content,
                     'error_status_code': response.status_code,
-                    'query': query
-                }
+                }, settings.SEARCH_ERROR_CACHE_EXPIRE_SECONDS
             else:
-                return helpers.parse_results(response, query, page)
+                return (
+                    helpers.parse_results(response, query, page),
+                    settings.SEARCH_RESULTS_CACHE_EXPIRE_SECONDS,
+                )
+
+    def get_context_data(self, **kwargs):
+        query = helpers.sanitise_query(self.request.GET.get('q', ''))
+        page = helpers.sanitise_page(self.request.GET.get('page', '1'))
+
+        # errors are cached briefly too, so an outage isn't made worse
+        cache_key = helpers.build_search_cache_key(query, page)
+        context = caches['default'].get(cache_key)
+        if context is None:
+            search_after = None
+            cursor = self.request.GET.get('cursor')
+            if cursor:
+                search_after = helpers.parse_search_cursor(cursor, query, page)
+            context, timeout = self.search(query, page, search_after)
+            caches['default'].set(cache_key, context, timeout)
+        return {**context, 'query': query}
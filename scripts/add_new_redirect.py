@@ -1,5 +1,6 @@
 """Script to easily add a new redirect. Requires package 'ansicolors'"""
 from colors import color
+import json
 import pathlib
 import os
 
@@ -7,19 +8,11 @@ import os
 __here__ = pathlib.Path(__file__).parent
 project_root = __here__ / ".."
 
-redirects_file = project_root / 'conf' / 'url_redirects.py'
+redirects_file = project_root / 'conf' / 'redirects.json'
 redirects_tests_file = project_root / 'conf' / 'tests' / \
     'test_url_redirects.py'
 
 start_redirects = 'redirects = [\n'
-redirect_template = (
-    '    url(\n'
-    "        r'^{}/$',\n"
-    '        QuerystringRedirectView.as_view(\n'
-    "            url='{}'),\n"
-    "        name='{}'\n"
-    '    ),\n'
-)
 test_template = "    ('/{}/', '{}'),\n"
 
 
@@ -42,6 +35,18 @@ def insert_new(new_code, file_path):
         f.write(new)
 
 
+def add_redirect(redirect_from, redirect_to, file_path):
+    """Add a redirect to the redirects file, one entry per line."""
+    with open(os.path.abspath(file_path)) as f:
+        entries = json.load(f)
+    entries.insert(0, {
+        'path': '/{}/'.format(redirect_from), 'url': redirect_to,
+    })
+    lines = ',\n'.join('  ' + json.dumps(entry) for entry in entries)
+    with open(file_path, "w") as f:
+        f.write('[\n' + lines + '\n]\n')
+
+
 def main():
     redirect_from = input(color(
         "Enter the path you wish to redirect FROM (do not start with '/'):\n",
@@ -49,26 +54,20 @@ def main():
     redirect_to = input(color(
         "Enter the url you wish to redirect TO (with a trailing '/'):\n",
         fg='purple', style='bold'))
-    redirect_name = input(color(
-        "Enter the name of the redirect:\n",
-        fg='purple', style='bold'))
     confirm = (
-        "Create {} that redirects "
+        "Create a redirect "
         "from /{}/ to {}. Is this correct? y/n\n").format(
-        redirect_name, redirect_from, redirect_to)
+        redirect_from, redirect_to)
 
     user_continue = input(color(confirm, fg='blue', style='bold'))
 
     if user_continue != 'y':
         return
 
-    redirect_code = redirect_template.format(
-        redirect_from, redirect_to, redirect_name)
-
-    insert_new(redirect_code, redirects_file)
+    add_redirect(redirect_from, redirect_to, redirects_file)
 
     print(color(
-        "Redirect added to url_redirects.py", fg='green', style='bold'))
+        "Redirect added to redirects.json", fg='green', style='bold'))
 
     test_code = test_template.format(redirect_from, redirect_to)
 
@@ -0,0 +1,48 @@
+"""Microbenchmark of core.helpers.sanitise_query against the original,
+per-call compiled implementation. Run from the project root with the same
+environment as manage.py:
+
+    python scripts/benchmark_sanitise_query.py
+"""
+import os
+import sys
+import timeit
+
+import django
+
+
+QUERIES = [
+    'export to france',
+    'AND OR NOT',
+    'innocent" "query":{ "match_all": {} }',
+    'food and drink (AND) exporting - "tariffs" NOT duties',
+    'a' * 200 + ' OR ' + 'b' * 200,
+]
+NUMBER = 20000
+
+
+def main():
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
+    django.setup()
+
+    from core.helpers import sanitise_query
+    from core.tests.helpers import legacy_sanitise_query
+
+    for query in QUERIES:
+        assert sanitise_query(query) == legacy_sanitise_query(query)
+        timings = [
+            timeit.timeit(lambda: function(query), number=NUMBER)
+            for function in (legacy_sanitise_query, sanitise_query)
+        ]
+        print('{query!r:.40}: legacy {legacy:.1f}us, current {current:.1f}us '
+              '({speedup:.1f}x)'.format(
+                  query=query,
+                  legacy=timings[0] / NUMBER * 1e6,
+                  current=timings[1] / NUMBER * 1e6,
+                  speedup=timings[0] / timings[1],
+              ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+from directory_components import context_processors
+
+from django.utils.functional import SimpleLazyObject
+
+
+def sso_processor(request):
+    """Wraps directory-components' processor so that `request.sso_user` is
+    only resolved if the template checks whether the user is logged in.
+
+    """
+
+    context = context_processors.sso_processor(request)
+    context['sso_is_logged_in'] = SimpleLazyObject(
+        lambda: bool(request.sso_user)
+    )
+    return context
@@ -1,15 +1,27 @@
+import hashlib
 import logging
 
+from directory_components.middleware import NoCacheMiddlware
 from directory_sso_api_client.client import sso_api_client
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import empty, SimpleLazyObject
 from requests.exceptions import RequestException
-from sso.utils import SSOUser
+
+from sso.utils import delete_company_profile_cache, SSOUser
 
 
 logger = logging.getLogger(__name__)
 
 
 class SSOUserMiddleware:
+    """Sets `request.sso_user`. When a session cookie is present it is a
+    lazy object, so SSO is only called if something reads the user. Because
+    the lazy object may wrap None, check it with `if request.sso_user` rather
+    than `is None`.
+
+    """
+
     MESSAGE_SSO_UNREACHABLE = 'Unable to reach SSO'
 
     def process_request(self, request):
@@ -17,15 +29,65 @@ class SSOUserMiddleware:
         session_id = request.COOKIES.get(settings.SSO_SESSION_COOKIE)
 
         if session_id:
-            try:
-                sso_response = sso_api_client.user.get_session_user(session_id)
-            except RequestException:
-                logger.error(self.MESSAGE_SSO_UNREACHABLE, exc_info=True)
-            else:
-                if sso_response.ok:
-                    sso_user_data = sso_response.json()
-                    request.sso_user = SSOUser(
-                        id=sso_user_data['id'],
-                        email=sso_user_data['email'],
-                        session_id=session_id,
-                    )
+            request.sso_user = SimpleLazyObject(
+                lambda: self.get_sso_user(session_id)
+            )
+
+    @staticmethod
+    def build_cache_key(session_id):
+        digest = hashlib.sha256(session_id.encode('utf-8')).hexdigest()
+        return 'sso-session-user:' + digest
+
+    def get_sso_user(self, session_id):
+        # invalid sessions are cached as False so they can be told apart from
+        # a cache miss
+        cache_key = self.build_cache_key(session_id)
+        sso_user = cache.get(cache_key)
+        if sso_user is not None:
+            return sso_user or None
+
+        try:
+            sso_response = sso_api_client.user.get_session_user(session_id)
+        except RequestException:
+            logger.error(self.MESSAGE_SSO_UNREACHABLE, exc_info=True)
+            return None
+
+        if sso_response.ok:
+            sso_user_data = sso_response.json()
+            sso_user = SSOUser(
+                id=sso_user_data['id'],
+                email=sso_user_data['email'],
+                session_id=session_id,
+            )
+            cache.set(
+                cache_key,
+                sso_user,
+                settings.SSO_SESSION_USER_CACHE_EXPIRE_SECONDS,
+            )
+            return sso_user
+
+        # the session has ended, e.g. the user logged out
+        delete_company_profile_cache(session_id)
+        cache.set(
+            cache_key,
+            False,
+            settings.SSO_SESSION_USER_NEGATIVE_CACHE_EXPIRE_SECONDS,
+        )
+
+
+class NoCacheMiddleware(NoCacheMiddlware):
+    """Tells the browser not to cache pages shown to a logged in user,
+    without resolving a lazy `request.sso_user` that nothing has read.
+    A response that never read the user holds nothing private to them.
+
+    """
+
+    def process_response(self, request, response):
+        sso_user = getattr(request, 'sso_user', None)
+        is_unresolved = (
+            isinstance(sso_user, SimpleLazyObject) and
+            sso_user._wrapped is empty
+        )
+        if is_unresolved:
+            return response
+        return super().process_response(request, response)
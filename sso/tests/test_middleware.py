@@ -3,9 +3,10 @@ from unittest.mock import patch, Mock
 import pytest
 import requests
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 
-from sso import middleware
+from sso import middleware, utils
 
 
 def api_response_ok(*args, **kwargs):
@@ -24,6 +25,7 @@ def api_response_bad():
 
 def test_sso_middleware_installed(settings):
     assert 'sso.middleware.SSOUserMiddleware' in settings.MIDDLEWARE_CLASSES
+    assert 'sso.middleware.NoCacheMiddleware' in settings.MIDDLEWARE_CLASSES
 
 
 @patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
@@ -80,3 +82,113 @@ def test_sso_middleware_timeout(
     log = caplog.records[-1]
     assert log.levelname == 'ERROR'
     assert log.msg == middleware.SSOUserMiddleware.MESSAGE_SSO_UNREACHABLE
+
+
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_caches_session_user(
+    mock_get_session_user, settings, client
+):
+    mock_get_session_user.return_value = api_response_ok()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+    settings.MIDDLEWARE_CLASSES = ['sso.middleware.SSOUserMiddleware']
+
+    for _ in range(2):
+        response = client.get(reverse('casestudy-york-bag'))
+
+    assert mock_get_session_user.call_count == 1
+    assert response._request.sso_user.id == 1
+    assert response._request.sso_user.session_id == '123'
+
+
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_caches_invalid_session(
+    mock_get_session_user, settings, client
+):
+    mock_get_session_user.return_value = api_response_bad()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+    settings.MIDDLEWARE_CLASSES = ['sso.middleware.SSOUserMiddleware']
+
+    for _ in range(2):
+        response = client.get(reverse('casestudy-york-bag'))
+
+    assert mock_get_session_user.call_count == 1
+    assert not response._request.sso_user
+
+
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_does_not_cache_sso_unreachable(
+    mock_get_session_user, settings, client
+):
+    mock_get_session_user.side_effect = requests.exceptions.ConnectionError()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+    settings.MIDDLEWARE_CLASSES = ['sso.middleware.SSOUserMiddleware']
+
+    for _ in range(2):
+        response = client.get(reverse('casestudy-york-bag'))
+
+    assert mock_get_session_user.call_count == 2
+    assert not response._request.sso_user
+
+
+@pytest.mark.parametrize('url', (
+    '/future/',
+    reverse('healthcheck:ping'),
+))
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_lazy_user_not_resolved_when_unused(
+    mock_get_session_user, url, settings, client
+):
+    # uses the full middleware stack from settings
+    mock_get_session_user.return_value = api_response_ok()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+
+    response = client.get(url)
+
+    assert response.status_code in (200, 302)
+    assert mock_get_session_user.call_count == 0
+    assert response.get('Cache-Control') != 'no-store, no-cache'
+
+
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_no_cache_middleware_logged_in_user(
+    mock_get_session_user, settings, client
+):
+    mock_get_session_user.return_value = api_response_ok()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+
+    response = client.get(reverse('casestudy-york-bag'))
+
+    assert mock_get_session_user.call_count == 1
+    assert response['Cache-Control'] == 'no-store, no-cache'
+
+
+@pytest.mark.parametrize('api_response,expected', (
+    (api_response_ok(), True),
+    (api_response_bad(), False),
+))
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_lazy_user_logged_in_context(
+    mock_get_session_user, api_response, expected, settings, client
+):
+    mock_get_session_user.return_value = api_response
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+    settings.MIDDLEWARE_CLASSES = ['sso.middleware.SSOUserMiddleware']
+
+    response = client.get(reverse('casestudy-york-bag'))
+
+    assert bool(response.context['sso_is_logged_in']) is expected
+    assert mock_get_session_user.call_count == 1
+
+
+@patch('directory_sso_api_client.client.sso_api_client.user.get_session_user')
+def test_sso_middleware_invalid_session_clears_company_profile(
+    mock_get_session_user, settings, client
+):
+    cache.set(utils.build_company_profile_cache_key('123'), {'name': 'Co'})
+    mock_get_session_user.return_value = api_response_bad()
+    client.cookies[settings.SSO_SESSION_COOKIE] = '123'
+    settings.MIDDLEWARE_CLASSES = ['sso.middleware.SSOUserMiddleware']
+
+    client.get(reverse('casestudy-york-bag'))
+
+    assert cache.get(utils.build_company_profile_cache_key('123')) is None
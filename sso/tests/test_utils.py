@@ -1,6 +1,11 @@
+from unittest.mock import call, patch, Mock
+
+import pytest
+
 from django.views import View
 from django.http.response import HttpResponse
 
+from core.tests.helpers import create_response
 from sso import utils
 
 
@@ -32,3 +37,61 @@ def test_sso_signup_required_mixin_redirect_to_sso(settings, rf):
     assert response.url == (
         f'{settings.SSO_PROXY_SIGNUP_URL}?next=http%3A//testserver/'
     )
+
+
+@pytest.mark.parametrize('status_code,json_body,expected', (
+    (200, {'name': 'Example corp'}, {'name': 'Example corp'}),
+    (404, {}, None),
+))
+@patch('directory_api_client.client.api_client.company.'
+       'retrieve_private_profile')
+def test_get_company_profile_cached(
+    mock_retrieve_private_profile, status_code, json_body, expected, rf
+):
+    mock_retrieve_private_profile.return_value = (
+        create_response(status_code, json_body)
+    )
+    request = rf.get('/')
+    request.sso_user = Mock(session_id=123)
+
+    for _ in range(3):
+        assert utils.get_company_profile(request) == expected
+
+    assert mock_retrieve_private_profile.call_count == 1
+    assert mock_retrieve_private_profile.call_args == call(sso_session_id=123)
+
+
+@patch('directory_api_client.client.api_client.company.'
+       'retrieve_private_profile')
+def test_get_company_profile_not_cached_on_error(
+    mock_retrieve_private_profile, rf
+):
+    mock_retrieve_private_profile.return_value = (
+        create_response(500)
+    )
+    request = rf.get('/')
+    request.sso_user = Mock(session_id=123)
+
+    for _ in range(2):
+        assert utils.get_company_profile(request) is None
+
+    assert mock_retrieve_private_profile.call_count == 2
+
+
+@patch('directory_api_client.client.api_client.company.'
+       'retrieve_private_profile')
+def test_get_company_profile_cache_per_session(
+    mock_retrieve_private_profile, rf
+):
+    mock_retrieve_private_profile.return_value = (
+        create_response(200, {'name': 'Example corp'})
+    )
+    request = rf.get('/')
+    request.sso_user = Mock(session_id=123)
+    utils.get_company_profile(request)
+    request.sso_user = Mock(session_id=456)
+    utils.get_company_profile(request)
+    utils.delete_company_profile_cache(456)
+    utils.get_company_profile(request)
+
+    assert mock_retrieve_private_profile.call_count == 3
@@ -1,6 +1,10 @@
 from collections import namedtuple
+import hashlib
+
+from directory_api_client.client import api_client
 
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponseRedirect, QueryDict
 from django.utils.six.moves.urllib.parse import urlparse, urlunparse
 from django.shortcuts import resolve_url
@@ -8,13 +12,48 @@ from django.shortcuts import resolve_url
 SSOUser = namedtuple('SSOUser', ['id', 'email', 'session_id'])
 
 
+def build_company_profile_cache_key(session_id):
+    digest = hashlib.sha256(str(session_id).encode('utf-8')).hexdigest()
+    return 'company-profile:' + digest
+
+
+def get_company_profile(request):
+    if request.sso_user:
+        # users without a company are cached as False so they can be told
+        # apart from a cache miss
+        cache_key = build_company_profile_cache_key(
+            request.sso_user.session_id
+        )
+        company_profile = cache.get(cache_key)
+        if company_profile is None:
+            response = api_client.company.retrieve_private_profile(
+                sso_session_id=request.sso_user.session_id,
+            )
+            if response.status_code == 200:
+                company_profile = response.json()
+            elif response.status_code == 404:
+                company_profile = False
+            else:
+                return None
+            cache.set(
+                cache_key,
+                company_profile,
+                settings.COMPANY_PROFILE_CACHE_EXPIRE_SECONDS,
+            )
+        return company_profile or None
+
+
+def delete_company_profile_cache(session_id):
+    cache.delete(build_company_profile_cache_key(session_id))
+
+
 class SSOAccountStateRequiredMixin:
     """ CBV mixin which verifies sso user """
 
     sso_redirect_url = None
 
     def dispatch(self, request, *args, **kwargs):
-        if request.sso_user is None:
+        if not request.sso_user:
             return self.handle_no_permission()
         return super().dispatch(request, *args, **kwargs)
 